@@ -0,0 +1,81 @@
+"""
+Benchmark: Phase 6 parallel connected components per worker count.
+
+Builds a synthetic match graph (benchmarks/synthetic.py), then for each
+worker count shards the edges by hash, reduces each shard to a spanning
+forest in a process pool and merges the forests
+(identity/parallel_components.py). Reports edges/sec and speedup against
+the single-process union-find of `--mode unionfind`, and checks that the
+clusters are the same. Here shards are pickled to the workers; in
+`run_identity_resolution.py --mode parallel` each worker reads its own
+shards from Postgres instead.
+
+    python benchmarks/bench_connected_components.py --edges 2m --workers 1,2,4,8
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "identity"))
+
+from parallel_components import component_assignment, parallel_components, shard_edges
+from synthetic import generate_match_graph
+from union_find import resolve_components
+
+SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+def parse_count(value):
+    value = value.strip().lower()
+    if value[-1] in SUFFIXES:
+        return int(float(value[:-1]) * SUFFIXES[value[-1]])
+    return int(value)
+
+def partition(assignment):
+    """Clusters as a set of frozensets, independent of the ids."""
+    clusters = {}
+    for record, (global_id, *_) in assignment.items():
+        clusters.setdefault(global_id, set()).add(record)
+    return {frozenset(members) for members in clusters.values()}
+
+def run(edges, workers, shards):
+    started = time.perf_counter()
+    sets, strongest = parallel_components(shard_edges(edges, shards), workers=workers)
+    assignment = component_assignment(sets, strongest)
+    return assignment, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--edges", default="1m")
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument(
+        "--shards", type=int, default=0,
+        help="edge shards (default: 4 per worker)"
+    )
+    parser.add_argument("--mean-cluster-size", type=float, default=4)
+    args = parser.parse_args()
+
+    edges, labels = generate_match_graph(
+        parse_count(args.edges), args.mean_cluster_size
+    )
+    print(f"{len(edges)} matched edges over {len(labels)} records")
+
+    started = time.perf_counter()
+    _, serial = resolve_components(edges, {}, {})
+    baseline = time.perf_counter() - started
+    reference = partition(serial)
+    print(f"single-process union-find: {baseline:.2f}s, {len(reference)} clusters")
+
+    print(f"{'workers':>8}{'shards':>8}{'seconds':>10}{'edges/s':>12}{'speedup':>9}  clusters")
+    for workers in (int(w) for w in args.workers.split(",")):
+        shards = args.shards or 4 * workers
+        assignment, seconds = run(edges, workers, shards)
+        print(
+            f"{workers:>8}{shards:>8}{seconds:>10.2f}{len(edges) / seconds:>12,.0f}"
+            f"{baseline / seconds:>8.1f}x  "
+            f"{'identical' if partition(assignment) == reference else 'DIFFERS'}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: object size and encode/decode cost per ingestion format.
+
+Generates producer-shaped sales events, encodes them with each producer
+output format, then decodes them through the ingestion readers with
+field projection. Reports MB and seconds per million records. Formats
+whose optional dependency is missing are skipped.
+
+    python benchmarks/bench_formats.py --rows 200000
+"""
+import argparse
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "ingestion"))
+sys.path.insert(0, str(ROOT / "producers"))
+
+from formats import iter_jsonl_batches, iter_parquet_batches
+from jsonl_reader import JSON_BACKEND
+from output_formats import SUFFIXES, encode_records
+from reference_data import generate_email, generate_name, generate_phone
+
+CHUNK_SIZE = 1024 * 1024
+RECORDS_PER_FILE = 50_000
+
+SALES_FIELDS = [
+    "order_id", "customer_email", "customer_name",
+    "zip_code", "order_amount", "event_ts",
+]
+
+def generate_sales_events(rows):
+    ts = datetime(2024, 3, 1).isoformat()
+    events = []
+
+    for _ in range(rows):
+        name = generate_name()
+        events.append({
+            "event_type": "order_created",
+            "order_id": str(uuid.uuid4()),
+            "customer_name": name,
+            "customer_email": generate_email(name),
+            "customer_phone": generate_phone(),
+            "zip_code": str(random.randint(110000, 560999)),
+            "order_amount": round(random.uniform(500, 5000), 2),
+            "event_ts": ts,
+            "producer_ts": ts,
+        })
+
+    return events
+
+def chunked(data):
+    for i in range(0, len(data), CHUNK_SIZE):
+        yield data[i:i + CHUNK_SIZE]
+
+def decode(data, fmt):
+    if fmt == "parquet":
+        batches = iter_parquet_batches(data, SALES_FIELDS)
+    else:
+        batches = iter_jsonl_batches(chunked(data), fmt, SALES_FIELDS)
+    return sum(len(rows) for rows, _ in batches)
+
+def run(rows):
+    events = generate_sales_events(rows)
+    files = [
+        events[i:i + RECORDS_PER_FILE]
+        for i in range(0, len(events), RECORDS_PER_FILE)
+    ]
+    per_million = 1_000_000 / rows
+
+    print(f"{rows} records in {len(files)} file(s), json backend: {JSON_BACKEND}")
+    print(f"  {'format':<10} {'MB/M rec':>10} {'encode s/M':>11} {'decode s/M':>11}")
+
+    for fmt in SUFFIXES:
+        try:
+            started = time.perf_counter()
+            bodies = [encode_records(f, fmt)[0] for f in files]
+            encode_s = time.perf_counter() - started
+
+            started = time.perf_counter()
+            decoded = sum(decode(body, fmt) for body in bodies)
+            decode_s = time.perf_counter() - started
+        except RuntimeError as exc:
+            print(f"  {fmt:<10} skipped: {exc}")
+            continue
+
+        assert decoded == rows, (fmt, decoded)
+        size_mb = sum(len(b) for b in bodies) / 1e6
+
+        print(
+            f"  {fmt:<10} {size_mb * per_million:>10.1f} "
+            f"{encode_s * per_million:>11.2f} {decode_s * per_million:>11.2f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    run(args.rows)
@@ -0,0 +1,70 @@
+"""
+Benchmark: Phase 5 scoring throughput per worker count.
+
+Scores synthetic blocked pairs (benchmarks/synthetic.py, email, phone
+and phonetic name blocks) with the streaming engine's batch scorer at
+each worker count, reports pairs/sec, and checks that the output is
+identical to the single-process run.
+
+    python benchmarks/bench_matching_workers.py --rows 20000 --workers 1,2,4,8
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "matching"))
+
+from run_matching_engine import BATCH_ROWS, score_batches
+from similarity import DEFAULT_CACHE_SIZE, CacheStats
+from synthetic import generate_blocked_pairs
+
+def run(pairs, workers, batch_rows, cache_size):
+    batches = (
+        pairs[i:i + batch_rows] for i in range(0, len(pairs), batch_rows)
+    )
+    stats = CacheStats()
+    started = time.perf_counter()
+    scored = [
+        row
+        for _, rows in score_batches(
+            batches, workers, cache_size=cache_size, cache_stats=stats
+        )
+        for row in rows
+    ]
+    lookups = stats.hits + stats.misses
+    hit_rate = stats.hits / lookups if lookups else 0
+    return scored, time.perf_counter() - started, hit_rate
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    parser.add_argument("--name-cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+    args = parser.parse_args()
+
+    pairs, _ = generate_blocked_pairs(args.rows)
+    print(f"{len(pairs)} blocked pairs from {args.rows} identity inputs")
+    print(
+        f"{'workers':>8}{'seconds':>10}{'pairs/s':>12}{'speedup':>9}"
+        f"{'cache hits':>12}  output"
+    )
+
+    reference = baseline = None
+    for workers in (int(w) for w in args.workers.split(",")):
+        scored, seconds, hit_rate = run(
+            pairs, workers, args.batch_rows, args.name_cache_size
+        )
+        if reference is None:
+            reference, baseline = scored, seconds
+
+        print(
+            f"{workers:>8}{seconds:>10.2f}{len(pairs) / seconds:>12,.0f}"
+            f"{baseline / seconds:>8.1f}x{hit_rate:>12.1%}  "
+            f"{'identical' if scored == reference else 'DIFFERS'}"
+        )
+
+if __name__ == "__main__":
+    main()
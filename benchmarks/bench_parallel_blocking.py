@@ -0,0 +1,93 @@
+"""
+Benchmark: wall-clock time of Phase 4.5 SQL blocking, serial vs parallel.
+
+Runs the single CREATE TABLE AS self-join of phase_4_5_blocking.sql,
+then blocking/run_parallel_blocking.py at each worker count, against the
+staging.identity_inputs of the configured database. Both leave their
+result in staging.identity_match_candidates_blocked; pair counts are
+printed so the two can be compared.
+
+    python benchmarks/bench_parallel_blocking.py --partitions 8 --workers 1,2,4,8
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "blocking"))
+
+from sqlalchemy import text
+
+from run_parallel_blocking import engine, run_parallel_blocking
+
+SERIAL_BLOCKING = """
+DROP TABLE IF EXISTS staging.identity_match_candidates_blocked;
+
+CREATE TABLE staging.identity_match_candidates_blocked AS
+SELECT
+    a.source_system        AS left_source_system,
+    a.source_record_id     AS left_record_id,
+    a.normalized_email     AS left_email,
+    a.normalized_phone     AS left_phone,
+    a.normalized_name      AS left_name,
+
+    b.source_system        AS right_source_system,
+    b.source_record_id     AS right_record_id,
+    b.normalized_email     AS right_email,
+    b.normalized_phone     AS right_phone,
+    b.normalized_name      AS right_name
+FROM staging.identity_inputs a
+JOIN staging.identity_inputs b
+  ON a.source_system <> b.source_system
+ AND (
+        (a.normalized_email IS NOT NULL AND a.normalized_email = b.normalized_email)
+     OR (a.normalized_phone IS NOT NULL AND a.normalized_phone = b.normalized_phone)
+    )
+ AND a.source_record_id < b.source_record_id;
+
+CREATE INDEX idx_blocked_left_record
+    ON staging.identity_match_candidates_blocked (left_source_system, left_record_id);
+
+CREATE INDEX idx_blocked_right_record
+    ON staging.identity_match_candidates_blocked (right_source_system, right_record_id);
+"""
+
+COUNT_PAIRS = "SELECT COUNT(*) FROM staging.identity_match_candidates_blocked"
+
+def run_serial():
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text(SERIAL_BLOCKING))
+        pairs = conn.execute(text(COUNT_PAIRS)).scalar()
+    return pairs, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--partitions", type=int, default=8)
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument(
+        "--skip-serial",
+        action="store_true",
+        help="skip the CREATE TABLE AS baseline (slow on large inputs)"
+    )
+    args = parser.parse_args()
+
+    results = []
+    if not args.skip_serial:
+        results.append(("serial CREATE TABLE AS", *run_serial()))
+
+    for workers in (int(w) for w in args.workers.split(",")):
+        started = time.perf_counter()
+        pairs = run_parallel_blocking(args.partitions, workers)
+        results.append((
+            f"parallel, {workers} workers", pairs, time.perf_counter() - started
+        ))
+
+    baseline = results[0][2]
+    print(f"\n{'mode':<26}{'pairs':>12}{'seconds':>10}{'speedup':>9}")
+    for mode, pairs, seconds in results:
+        print(f"{mode:<26}{pairs:>12}{seconds:>10.2f}{baseline / seconds:>8.1f}x")
+
+if __name__ == "__main__":
+    main()
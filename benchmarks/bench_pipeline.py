@@ -0,0 +1,284 @@
+"""
+Benchmark suite: Phase 4.5 to 6 at scale factors.
+
+For each scale factor, generates labelled identity inputs from the
+producers' shared identity pool (benchmarks/synthetic.py), then runs:
+
+    blocking     blocking/block_index.py (in-memory inverted index)
+    scoring      the Phase 5 batch scorer (score_pair rules)
+    resolution   an in-memory replica of the Phase 6 per-pair resolver,
+                 or its union-find mode (--resolver unionfind)
+
+and reports pairs/sec per stage, peak RSS and pairwise precision/recall
+of the resulting clusters against the identity labels (pool emails are
+derived from the name, so distinct identities share them, and email
+merges show up as lost precision). Each scale runs
+in a fresh process, so its peak RSS is its own. Results are written to
+a JSON file tagged with the git commit, for comparison between commits.
+
+    python benchmarks/bench_pipeline.py --scales 10k,100k,1m
+    python benchmarks/bench_pipeline.py --scales 10m --representative
+    python benchmarks/bench_pipeline.py --resolver unionfind
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "blocking"))
+sys.path.insert(0, str(ROOT / "identity"))
+sys.path.insert(0, str(ROOT / "matching"))
+
+from block_index import DEFAULT_MAX_BLOCK_SIZE, KEY_FUNCTIONS, BlockIndex
+from run_matching_engine import BATCH_ROWS, score_batches
+from synthetic import generate_identity_inputs
+from union_find import resolve_edges
+
+MATCH_DECISIONS = {"AUTO_MERGE", "FLAG_REVIEW"}
+
+SUFFIXES = {"k": 1_000, "m": 1_000_000}
+
+def parse_scale(value):
+    value = value.strip().lower()
+    if value[-1] in SUFFIXES:
+        return int(float(value[:-1]) * SUFFIXES[value[-1]])
+    return int(value)
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def peak_rss_mb():
+    # ru_maxrss is in KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+# =====================
+# STAGES
+# =====================
+
+def run_blocking(records, key_types, max_block_size, representative):
+    """Candidate pairs as two parallel arrays of record indices."""
+    index = BlockIndex(records, key_types, max_block_size, representative)
+    lefts, rights = array("I"), array("I")
+    for left, right in index.pairs():
+        lefts.append(left)
+        rights.append(right)
+    return lefts, rights
+
+def run_scoring(records, lefts, rights):
+    """Matched pairs as (left index, right index, total, decision)."""
+    def batches():
+        for start in range(0, len(lefts), BATCH_ROWS):
+            yield [
+                records[left] + records[right]
+                for left, right in zip(
+                    lefts[start:start + BATCH_ROWS], rights[start:start + BATCH_ROWS]
+                )
+            ]
+
+    matches = []
+    position = 0
+    for size, scored in score_batches(batches()):
+        for offset, row in enumerate(scored):
+            if row[-1] in MATCH_DECISIONS:
+                matches.append((
+                    lefts[position + offset], rights[position + offset],
+                    row[-2], row[-1],
+                ))
+        position += size
+    return matches
+
+def resolve_per_pair(matches):
+    """
+    In-memory replica of identity/run_identity_resolution.py: pairs in
+    order, the left cluster absorbs the right one, records keep the
+    first id they are inserted with. Returns record index -> cluster id.
+    """
+    assignment = {}
+    members = {}
+    next_id = 0
+
+    for left, right, _, _ in matches:
+        left_id = assignment.get(left)
+        right_id = assignment.get(right)
+
+        if left_id is not None and right_id is not None and left_id != right_id:
+            global_id = left_id
+            moved = members.pop(right_id)
+            for record in moved:
+                assignment[record] = global_id
+            members[global_id].extend(moved)
+        elif left_id is not None:
+            global_id = left_id
+        elif right_id is not None:
+            global_id = right_id
+        else:
+            global_id = next_id
+            next_id += 1
+            members[global_id] = []
+
+        for record in (left, right):
+            if record not in assignment:
+                assignment[record] = global_id
+                members[global_id].append(record)
+
+    return assignment
+
+def resolve_union_find(matches):
+    """Phase 6 union-find mode on an empty map; same clusters as above."""
+    ids = iter(range(len(matches) + 1))
+    _, new_records = resolve_edges(matches, {}, lambda: next(ids))
+    return {record: cluster for record, (cluster, _, _) in new_records.items()}
+
+RESOLVERS = {"pairs": resolve_per_pair, "unionfind": resolve_union_find}
+
+def pairwise_quality(labels, assignment):
+    """Pairwise precision and recall of the clusters against labels."""
+    def pairs(counts):
+        return sum(n * (n - 1) // 2 for n in counts)
+
+    # records without a cluster are singletons
+    predicted = pairs(Counter(assignment.values()).values())
+    actual = pairs(Counter(labels).values())
+    true_positive = pairs(Counter(
+        (cluster, labels[record]) for record, cluster in assignment.items()
+    ).values())
+
+    return (
+        true_positive / predicted if predicted else 1.0,
+        true_positive / actual if actual else 1.0,
+    )
+
+def rate(count, seconds):
+    return round(count / seconds) if seconds else None
+
+def run_scale(
+    rows, key_types, max_block_size, representative, typo_rate, resolver="pairs"
+):
+    started = time.perf_counter()
+    records, labels = generate_identity_inputs(rows, typo_rate)
+    generate_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    lefts, rights = run_blocking(records, key_types, max_block_size, representative)
+    blocking_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matches = run_scoring(records, lefts, rights)
+    scoring_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    assignment = RESOLVERS[resolver](matches)
+    resolution_seconds = time.perf_counter() - started
+
+    precision, recall = pairwise_quality(labels, assignment)
+
+    return {
+        "records": len(records),
+        "candidate_pairs": len(lefts),
+        "matched_pairs": len(matches),
+        "clusters": len(set(assignment.values())),
+        "seconds": {
+            "generate": round(generate_seconds, 3),
+            "blocking": round(blocking_seconds, 3),
+            "scoring": round(scoring_seconds, 3),
+            "resolution": round(resolution_seconds, 3),
+        },
+        "pairs_per_sec": {
+            "blocking": rate(len(lefts), blocking_seconds),
+            "scoring": rate(len(lefts), scoring_seconds),
+            "resolution": rate(len(matches), resolution_seconds),
+        },
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+    }
+
+# =====================
+# MAIN
+# =====================
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", default="10k,100k,1m")
+    parser.add_argument("--keys", default="email,phone")
+    parser.add_argument("--max-block-size", type=int, default=DEFAULT_MAX_BLOCK_SIZE)
+    parser.add_argument("--representative", action="store_true")
+    parser.add_argument("--typo-rate", type=float, default=0.0)
+    parser.add_argument("--resolver", choices=sorted(RESOLVERS), default="pairs")
+    parser.add_argument(
+        "--output",
+        help="JSON results file (default: benchmarks/results/<commit>.json)"
+    )
+    args = parser.parse_args()
+
+    key_types = [k.strip() for k in args.keys.split(",") if k.strip()]
+    unknown = set(key_types) - set(KEY_FUNCTIONS)
+    if unknown:
+        parser.error(f"unknown key types: {', '.join(sorted(unknown))}")
+
+    commit = git_commit()
+    config = {
+        "keys": key_types,
+        "max_block_size": args.max_block_size,
+        "representative": args.representative,
+        "typo_rate": args.typo_rate,
+        "resolver": args.resolver,
+    }
+    results = []
+
+    print(
+        f"{'records':>10}{'pairs':>12}{'block p/s':>12}{'score p/s':>12}"
+        f"{'resolve p/s':>13}{'peak MB':>9}{'precision':>11}{'recall':>8}"
+    )
+    for scale in (parse_scale(s) for s in args.scales.split(",")):
+        # a fresh process per scale: peak RSS is that scale's own
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as pool:
+            result = pool.submit(
+                run_scale, scale, key_types, args.max_block_size,
+                args.representative, args.typo_rate, args.resolver,
+            ).result()
+        results.append({"scale": scale, **result})
+
+        rates = result["pairs_per_sec"]
+        print(
+            f"{result['records']:>10}{result['candidate_pairs']:>12}"
+            f"{rates['blocking'] or 0:>12,}{rates['scoring'] or 0:>12,}"
+            f"{rates['resolution'] or 0:>13,}{result['peak_rss_mb']:>9.0f}"
+            f"{result['precision']:>11.4f}{result['recall']:>8.4f}"
+        )
+
+    output = Path(args.output) if args.output else (
+        ROOT / "benchmarks" / "results" / f"{(commit or 'unknown')[:12]}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": config,
+        "results": results,
+    }, indent=2))
+    print(f"results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: name similarity backends against SequenceMatcher.ratio().
+
+Takes (left_name, right_name) pairs from the blocked candidates table
+(--source db, real Phase 4.5 output) or from synthetic blocked pairs
+with typo noise (--source synthetic). Every backend's threshold
+decisions are compared with the Phase 5 reference,
+SequenceMatcher(None, a, b).ratio() >= 0.85 per pair, and their
+disagreements reported (none for exact backends, which
+tests/test_similarity.py checks). Reports pairs/sec and speedup over
+the reference loop.
+
+    python benchmarks/bench_similarity.py --source db --limit 1000000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "matching"))
+
+from similarity import (
+    BACKENDS,
+    EXACT_BACKENDS,
+    NAME_THRESHOLD,
+    ratio,
+    similar_batch,
+)
+
+BATCH_ROWS = 5_000
+
+FETCH_NAMES = """
+SELECT left_name, right_name
+FROM staging.identity_match_candidates_blocked
+LIMIT :limit
+"""
+
+def load_db_pairs(limit):
+    from sqlalchemy import text
+    from run_matching_engine import engine
+
+    with engine.connect() as conn:
+        return [tuple(r) for r in conn.execute(text(FETCH_NAMES), {"limit": limit})]
+
+def load_synthetic_pairs(rows, typo_rate):
+    from synthetic import generate_blocked_pairs
+
+    pairs, _ = generate_blocked_pairs(rows, typo_rate=typo_rate)
+    return [(p[4], p[9]) for p in pairs]
+
+def reference(pairs):
+    return [bool(a and b) and ratio(a, b) >= NAME_THRESHOLD for a, b in pairs]
+
+def batched(pairs, backend):
+    decisions = []
+    for i in range(0, len(pairs), BATCH_ROWS):
+        decisions += similar_batch(pairs[i:i + BATCH_ROWS], NAME_THRESHOLD, backend)
+    return decisions
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--source", choices=["db", "synthetic"], default="synthetic")
+    parser.add_argument("--limit", type=int, default=1_000_000)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--typo-rate", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.source == "db":
+        pairs = load_db_pairs(args.limit)
+    else:
+        pairs = load_synthetic_pairs(args.rows, args.typo_rate)
+
+    named = sum(1 for a, b in pairs if a and b)
+    expected, baseline = timed(reference, pairs)
+    print(
+        f"{len(pairs)} pairs ({named} with both names, "
+        f"{len(set(pairs))} distinct), {sum(expected)} reach {NAME_THRESHOLD}"
+    )
+    print(f"{'backend':<14}{'seconds':>9}{'pairs/s':>12}{'speedup':>9}{'differ':>8}")
+    print(f"{'reference':<14}{baseline:>9.2f}{len(pairs) / baseline:>12,.0f}{1:>8.1f}x{0:>8}")
+
+    for backend in sorted(BACKENDS):
+        decisions, seconds = timed(batched, pairs, backend)
+        differ = sum(d != e for d, e in zip(decisions, expected))
+        exact = backend in EXACT_BACKENDS
+        print(
+            f"{backend:<14}{seconds:>9.2f}{len(pairs) / seconds:>12,.0f}"
+            f"{baseline / seconds:>8.1f}x{differ:>8}"
+            f"{'' if exact else '  (approximate)'}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Micro-benchmark: legacy vs linear-time JSONL reader.
+
+Reads producer-style JSONL files from --path (e.g. a `mc mirror` of the
+bucket), or generates one sales file in memory with the producer record
+shape, and reports rows/sec for the legacy `buffer.split` reader and for
+jsonl_reader with and without field projection.
+
+    python benchmarks/bench_stream_jsonl.py --rows 200000
+    python benchmarks/bench_stream_jsonl.py --path /data/mdm-ingestion/sales
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "ingestion"))
+sys.path.insert(0, str(ROOT / "producers"))
+
+from jsonl_reader import JSON_BACKEND, iter_jsonl
+from reference_data import generate_email, generate_name, generate_phone
+
+CHUNK_SIZE = 1024 * 1024
+
+SALES_FIELDS = [
+    "order_id", "customer_email", "customer_name",
+    "zip_code", "order_amount", "event_ts",
+]
+
+# =====================
+# INPUT
+# =====================
+
+def generate_sales_file(rows):
+    ts = datetime(2024, 3, 1).isoformat()
+    records = []
+
+    for _ in range(rows):
+        name = generate_name()
+        records.append(json.dumps({
+            "event_type": "order_created",
+            "order_id": str(uuid.uuid4()),
+            "customer_name": name,
+            "customer_email": generate_email(name),
+            "customer_phone": generate_phone(),
+            "zip_code": str(random.randint(110000, 560999)),
+            "order_amount": round(random.uniform(500, 5000), 2),
+            "event_ts": ts,
+            "producer_ts": ts,
+        }))
+
+    return "\n".join(records).encode()
+
+def load_files(path):
+    files = sorted(p for p in Path(path).rglob("*.jsonl") if p.is_file())
+    return [p.read_bytes() for p in files]
+
+def chunked(data):
+    for i in range(0, len(data), CHUNK_SIZE):
+        yield data[i:i + CHUNK_SIZE]
+
+# =====================
+# READERS
+# =====================
+
+def legacy_reader(chunks, fields=None):
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+
+        while b"\n" in buffer:
+            line, buffer = buffer.split(b"\n", 1)
+            if line.strip():
+                yield json.loads(line.decode("utf-8"))
+
+    if buffer.strip():
+        yield json.loads(buffer.decode("utf-8"))
+
+def batched_reader(chunks, fields=None):
+    return iter_jsonl(chunks, fields)
+
+READERS = [
+    ("legacy", legacy_reader, None),
+    ("batched", batched_reader, None),
+    ("batched+projection", batched_reader, SALES_FIELDS),
+]
+
+# =====================
+# RUNNER
+# =====================
+
+def run(files, repeat):
+    total_bytes = sum(len(f) for f in files)
+    print(
+        f"{len(files)} file(s), {total_bytes / 1e6:.1f} MB, "
+        f"json backend: {JSON_BACKEND}"
+    )
+
+    baseline = None
+    for label, reader, fields in READERS:
+        best = float("inf")
+        rows = 0
+
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = sum(1 for f in files for _ in reader(chunked(f), fields))
+            best = min(best, time.perf_counter() - started)
+
+        baseline = baseline or best
+        print(
+            f"  {label:<20} {rows:>9} rows  {best:7.3f}s  "
+            f"{rows / best:>12,.0f} rows/sec  x{baseline / best:.1f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--path", help="directory of producer .jsonl files")
+    parser.add_argument("--rows", type=int, default=50_000,
+                        help="rows to generate when --path is not given")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    files = load_files(args.path) if args.path else [generate_sales_file(args.rows)]
+    run(files, args.repeat)
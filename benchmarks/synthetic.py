@@ -0,0 +1,136 @@
+"""
+Labelled synthetic identity inputs for the blocking and matching benchmarks.
+
+Records are drawn from the producers' shared identity pool with the
+source mix of producers/run_producers.py, and normalized as Phase 3/4
+would, so they have the staging.identity_inputs tuple shape
+(source_system, source_record_id, email, phone, name). The label of a
+record is the phone of the identity it was drawn from, which is unique
+per identity, so two records are a true match when their labels are
+equal. Optional typo noise edits one character of the name.
+"""
+import random
+import sys
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "blocking"))
+sys.path.insert(0, str(ROOT / "ingestion"))
+sys.path.insert(0, str(ROOT / "producers"))
+
+from block_index import BlockIndex
+from normalize import normalize_phone, normalize_text
+
+# the identity pool is built with the module-level RNG at import time
+random.seed(0)
+from shared_identities import get_identity
+
+# records per source in producers/run_producers.py (thousands)
+SOURCE_MIX = {"sales": 1200, "support": 600, "marketing": 2000}
+
+LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+def add_typo(name, rng):
+    """Delete, substitute or transpose one character of the name."""
+    if len(name) < 3:
+        return name
+
+    i = rng.randrange(1, len(name) - 1)
+    edit = rng.randrange(3)
+    if edit == 0:
+        return name[:i] + name[i + 1:]
+    if edit == 1:
+        return name[:i] + rng.choice(LETTERS) + name[i + 1:]
+    return name[:i - 1] + name[i] + name[i - 1] + name[i + 1:]
+
+def generate_identity_inputs(rows, typo_rate=0.0, seed=42):
+    """Return (records, labels) for `rows` identity inputs."""
+    rng = random.Random(seed)
+    random.seed(seed)
+
+    total = sum(SOURCE_MIX.values())
+    sources = [
+        s for s, share in SOURCE_MIX.items()
+        for _ in range(round(rows * share / total))
+    ]
+    rng.shuffle(sources)
+
+    records, labels = [], []
+    for source in sources:
+        name, email, phone = get_identity()
+        name = normalize_text(name)
+        if typo_rate and rng.random() < typo_rate:
+            name = add_typo(name, rng)
+
+        record_id = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+        if source == "sales":
+            record = (source, record_id, normalize_text(email), None, name)
+        elif source == "support":
+            record = (source, record_id, normalize_text(email), None, None)
+        else:
+            record = (source, record_id, None, normalize_phone(phone), name)
+
+        records.append(record)
+        labels.append(phone)
+
+    return records, labels
+
+def generate_blocked_pairs(
+    rows,
+    key_types=("email", "phone", "name_phonetic"),
+    typo_rate=0.0,
+    seed=42,
+):
+    """
+    Blocked candidate pair tuples in the column order of
+    staging.identity_match_candidates_blocked (left record, right record),
+    with the (left label, right label) of each pair.
+    """
+    records, labels = generate_identity_inputs(rows, typo_rate, seed)
+    index = BlockIndex(records, key_types)
+
+    pairs, pair_labels = [], []
+    for left, right in index.pairs():
+        pairs.append(records[left] + records[right])
+        pair_labels.append((labels[left], labels[right]))
+
+    return pairs, pair_labels
+
+def generate_match_graph(edges, mean_cluster_size=4, seed=42):
+    """
+    Synthetic Phase 6 input: `edges` matched edges
+    (left record, right record, confidence_score, decision) over clusters
+    of geometrically distributed size. Each cluster is connected by a
+    random spanning tree plus as many extra edges again, and edges come
+    in random order, so components only close late in the stream.
+    Returns (edges, labels) with labels mapping record -> cluster number.
+    """
+    rng = random.Random(seed)
+    sources = list(SOURCE_MIX)
+    graph, labels = [], {}
+    cluster = 0
+
+    while len(graph) < edges:
+        size = 2
+        while rng.random() > 1 / (mean_cluster_size - 1):
+            size += 1
+        records = [
+            (rng.choice(sources), str(uuid.UUID(int=rng.getrandbits(128), version=4)))
+            for _ in range(size)
+        ]
+        for record in records:
+            labels[record] = cluster
+
+        links = [(records[i], rng.choice(records[:i])) for i in range(1, size)]
+        links += [tuple(rng.sample(records, 2)) for _ in range(size - 1)]
+        for left, right in links:
+            score = rng.choice((70, 100, 140))
+            graph.append((
+                left, right, score, "AUTO_MERGE" if score >= 100 else "FLAG_REVIEW"
+            ))
+        cluster += 1
+
+    del graph[edges:]
+    rng.shuffle(graph)
+    return graph, labels
@@ -0,0 +1,281 @@
+from collections import defaultdict
+from dataclasses import dataclass
+
+from name_keys import phonetic_key, qgram_keys, sort_key
+
+# =====================
+# RECORDS
+# =====================
+# identity input tuples, as read from staging.identity_inputs
+
+SOURCE, RECORD_ID, EMAIL, PHONE, NAME = range(5)
+
+def name_key(function):
+    def keys(r):
+        key = function(r[NAME]) if r[NAME] else None
+        return (key,) if key else ()
+    return keys
+
+# key type -> record -> blocking keys (tuple, possibly empty)
+KEY_FUNCTIONS = {
+    "email": lambda r: (r[EMAIL],) if r[EMAIL] else (),
+    "phone": lambda r: (r[PHONE],) if r[PHONE] else (),
+    # fuzzy name keys (blocking/name_keys.py): the only link between
+    # marketing leads (no email) and sales orders (no phone)
+    "name_phonetic": name_key(phonetic_key),
+    "name_qgram": lambda r: qgram_keys(r[NAME]) if r[NAME] else (),
+}
+
+# exact-match keys: any cross-source pair in the block is decided by the
+# key alone (email -> AUTO_MERGE, phone -> FLAG_REVIEW), whatever the
+# names, so the block only needs to be connected, not fully paired
+EXACT_KEY_TYPES = {"email", "phone"}
+
+DEFAULT_KEY_TYPES = ("email", "phone")
+DEFAULT_MAX_BLOCK_SIZE = 1000
+
+# stats label of the sorted-neighbourhood pass
+NEIGHBOURHOOD = "sorted_neighbourhood"
+
+# =====================
+# STATS
+# =====================
+
+@dataclass
+class KeyStats:
+    blocks: int = 0
+    oversize_blocks: int = 0
+    pairs: int = 0
+    # cross-source pairs of the oversize blocks (not emitted)
+    skipped_pairs: int = 0
+    # cross-source pairs of all blocks, i.e. what a full join emits
+    join_pairs: int = 0
+
+def cross_source_pairs(records, members):
+    """Number of cross-source pairs in a block, without enumerating them."""
+    per_source = defaultdict(int)
+    for i in members:
+        per_source[records[i][SOURCE]] += 1
+
+    n = len(members)
+    return (n * n - sum(c * c for c in per_source.values())) // 2
+
+# =====================
+# INVERTED INDEX
+# =====================
+
+class BlockIndex:
+    """
+    In-memory inverted index over identity inputs.
+
+    One pass over the records builds a key -> members index per key
+    type. pairs() then streams cross-source candidate pairs block by
+    block, in the same shape as the Phase 4.5 SQL join
+    (left_record_id < right_record_id, each pair once even when it
+    shares several keys). Blocks larger than max_block_size are skipped
+    and logged instead of being expanded quadratically.
+
+    With representative=True, blocks of EXACT_KEY_TYPES emit O(n)
+    pairs linking each member to a block representative instead of all
+    O(n²) pairs; the connected components, and so the Phase 6 clusters,
+    are the same. Those blocks are never capped, since star pairs are
+    linear and skipping a block would drop its whole cluster.
+
+    With window > 1, a sorted-neighbourhood pass then pairs each named
+    record with the next window - 1 records in surname-first name order,
+    which catches name variants that share no key.
+    """
+
+    def __init__(
+        self,
+        records,
+        key_types=DEFAULT_KEY_TYPES,
+        max_block_size=DEFAULT_MAX_BLOCK_SIZE,
+        representative=False,
+        window=0,
+    ):
+        self.records = records
+        self.key_types = list(key_types)
+        self.max_block_size = max_block_size
+        self.representative = representative
+        self.window = window
+
+        self.keys = {t: [] for t in self.key_types}
+        self.index = {t: defaultdict(list) for t in self.key_types}
+        self.stats = {t: KeyStats() for t in self.key_types}
+        if window > 1:
+            self.stats[NEIGHBOURHOOD] = KeyStats()
+        self.oversize = []
+
+        functions = [(t, KEY_FUNCTIONS[t]) for t in self.key_types]
+        for i, record in enumerate(records):
+            for key_type, key_function in functions:
+                keys = key_function(record)
+                self.keys[key_type].append(keys)
+                for key in keys:
+                    self.index[key_type][key].append(i)
+
+    # ---------------------
+    # PAIR GENERATION
+    # ---------------------
+
+    def pairs(self):
+        """Yield (left_index, right_index) candidate pairs."""
+        for position, key_type in enumerate(self.key_types):
+            stats = self.stats[key_type]
+            expand = (
+                self.star_pairs
+                if self.representative and key_type in EXACT_KEY_TYPES
+                else self.block_pairs
+            )
+
+            for key, members in self.index[key_type].items():
+                if len(members) < 2:
+                    continue
+
+                stats.blocks += 1
+                join_pairs = cross_source_pairs(self.records, members)
+                stats.join_pairs += join_pairs
+
+                if self.capped(key_type, len(members)):
+                    stats.oversize_blocks += 1
+                    stats.skipped_pairs += join_pairs
+                    self.oversize.append((key_type, key, len(members)))
+                    continue
+
+                for left, right in expand(members):
+                    if self.emitted_earlier(left, right, position, key):
+                        continue
+                    stats.pairs += 1
+                    yield left, right
+
+        if self.window > 1:
+            yield from self.neighbourhood_pairs()
+
+    def capped(self, key_type, size):
+        """True when a block of this type and size is skipped."""
+        if self.representative and key_type in EXACT_KEY_TYPES:
+            return False
+        return size > self.max_block_size
+
+    def block_pairs(self, members):
+        """All cross-source pairs of a block, ordered by record id."""
+        records = self.records
+
+        for a, i in enumerate(members):
+            source_i, id_i = records[i][SOURCE], records[i][RECORD_ID]
+
+            for j in members[a + 1:]:
+                if records[j][SOURCE] == source_i:
+                    continue
+
+                id_j = records[j][RECORD_ID]
+                if id_i < id_j:
+                    yield i, j
+                elif id_j < id_i:
+                    yield j, i
+
+    def star_pairs(self, members):
+        """
+        Cross-source pairs linking every member of a block to a hub.
+
+        The representative is the member with the smallest record id;
+        members of other sources link to it, and members of its own
+        source link to the first member of another source. A block with
+        a single source yields nothing, as in the full expansion.
+        """
+        records = self.records
+        ordered = sorted(members, key=lambda i: records[i][RECORD_ID])
+
+        representative = ordered[0]
+        rep_source = records[representative][SOURCE]
+        anchor = next(
+            (i for i in ordered if records[i][SOURCE] != rep_source), None
+        )
+        if anchor is None:
+            return
+
+        for i in ordered[1:]:
+            hub = representative if records[i][SOURCE] != rep_source else anchor
+            if records[i][RECORD_ID] < records[hub][RECORD_ID]:
+                yield i, hub
+            else:
+                yield hub, i
+
+    def neighbourhood_pairs(self):
+        """
+        Cross-source pairs within a sliding window over the records
+        sorted by sort_key (ties by record id), skipping pairs that
+        already share a key.
+        """
+        records = self.records
+        stats = self.stats[NEIGHBOURHOOD]
+        after_keys = len(self.key_types)
+
+        ordered = sorted(
+            (i for i, r in enumerate(records) if r[NAME] and sort_key(r[NAME])),
+            key=lambda i: (sort_key(records[i][NAME]), records[i][RECORD_ID]),
+        )
+        stats.blocks = max(len(ordered) - self.window + 1, 0)
+
+        for a, i in enumerate(ordered):
+            source_i, id_i = records[i][SOURCE], records[i][RECORD_ID]
+
+            for j in ordered[a + 1:a + self.window]:
+                if records[j][SOURCE] == source_i:
+                    continue
+
+                id_j = records[j][RECORD_ID]
+                if id_i == id_j:
+                    continue
+                left, right = (i, j) if id_i < id_j else (j, i)
+
+                if self.emitted_earlier(left, right, after_keys):
+                    continue
+                stats.pairs += 1
+                yield left, right
+
+    def emitted_earlier(self, left, right, position, key=None):
+        """
+        True when the pair also shares a key that was expanded before
+        this one: a key of an earlier type, or a smaller key of the same
+        type. Either way the pair has already been yielded or, for
+        representative blocks, its two records are already connected.
+        A position past the last key type checks every type.
+        """
+        for p, key_type in enumerate(self.key_types[:position + 1]):
+            keys = self.keys[key_type]
+            same_type = p == position
+
+            for shared in keys[left]:
+                if shared not in keys[right]:
+                    continue
+                if same_type and shared >= key:
+                    continue
+                if not self.capped(key_type, len(self.index[key_type][shared])):
+                    return True
+
+        return False
+
+    # ---------------------
+    # REPORTING
+    # ---------------------
+
+    def report(self):
+        emitted = sum(s.pairs for s in self.stats.values())
+        uncapped = sum(s.join_pairs for s in self.stats.values())
+
+        for key_type, s in self.stats.items():
+            print(
+                f"  {key_type:<20} blocks={s.blocks} oversize={s.oversize_blocks} "
+                f"pairs={s.pairs} skipped={s.skipped_pairs}"
+            )
+
+        for key_type, key, size in sorted(self.oversize, key=lambda o: -o[2])[:20]:
+            print(f"  ⚠ oversize {key_type} block {key!r}: {size} records")
+
+        ratio = uncapped / emitted if emitted else float("inf")
+        print(
+            f"  {emitted} pairs emitted vs ~{uncapped} from the SQL join "
+            f"(reduction x{ratio:.1f})"
+        )
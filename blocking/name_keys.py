@@ -0,0 +1,89 @@
+import zlib
+from functools import lru_cache
+
+# =====================
+# NAME BLOCKING KEYS
+# =====================
+# Keys for linking records through normalized_name alone (e.g. marketing
+# leads, which have no email, to sales orders, which have no phone).
+# All functions are deterministic across processes and runs, so keys can
+# be persisted (staging.identity_block_index) and compared between runs.
+
+NAME_CACHE_SIZE = 1 << 16
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+# MinHash LSH over character q-grams: BANDS keys per name, each the
+# minimum of ROWS hash permutations; names with Jaccard similarity s
+# share at least one key with probability 1 - (1 - s^ROWS)^BANDS
+QGRAM_SIZE = 3
+BANDS = 4
+ROWS = 2
+_PRIME = (1 << 31) - 1
+_PERMUTATIONS = [
+    (2 * i + 1) * 0x9E3779B1 % _PRIME
+    for i in range(BANDS * ROWS)
+]
+
+def tokens(name):
+    return [t for t in "".join(
+        c if c.isalnum() else " " for c in name.lower()
+    ).split() if t]
+
+def soundex(token):
+    """American Soundex code of a single token (e.g. 'sharma' -> 'S650')."""
+    letters = [c for c in token.lower() if c.isalpha()]
+    if not letters:
+        return ""
+
+    code = letters[0].upper()
+    previous = SOUNDEX_CODES.get(letters[0], "")
+
+    for c in letters[1:]:
+        digit = SOUNDEX_CODES.get(c, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        # h and w do not separate letters with the same code
+        if c not in "hw":
+            previous = digit
+
+    return code.ljust(4, "0")
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def phonetic_key(name):
+    """Sorted Soundex codes of the name tokens; token order is ignored."""
+    codes = sorted(filter(None, (soundex(t) for t in tokens(name))))
+    return " ".join(codes) or None
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def sort_key(name):
+    """Surname-first key for sorted-neighbourhood windows."""
+    parts = tokens(name)
+    return " ".join(reversed(parts)) or None
+
+@lru_cache(maxsize=NAME_CACHE_SIZE)
+def qgram_keys(name):
+    """MinHash LSH band keys over padded character q-grams."""
+    text = f"#{' '.join(tokens(name))}#"
+    if len(text) <= 2:
+        return ()
+
+    grams = {
+        zlib.crc32(text[i:i + QGRAM_SIZE].encode())
+        for i in range(max(len(text) - QGRAM_SIZE + 1, 1))
+    }
+    signature = [min((a * g) % _PRIME for g in grams) for a in _PERMUTATIONS]
+
+    return tuple(
+        f"{band}:" + "-".join(map(str, signature[band * ROWS:(band + 1) * ROWS]))
+        for band in range(BANDS)
+    )
@@ -0,0 +1,494 @@
+import argparse
+import csv
+import io
+import time
+from sqlalchemy import create_engine, text
+import os
+from dotenv import load_dotenv
+from tqdm import tqdm
+
+from block_index import (
+    DEFAULT_KEY_TYPES,
+    DEFAULT_MAX_BLOCK_SIZE,
+    KEY_FUNCTIONS,
+    RECORD_ID,
+    SOURCE,
+    BlockIndex,
+)
+
+# =====================
+# ENV & ENGINE
+# =====================
+
+load_dotenv()
+
+engine = create_engine(
+    f"postgresql+psycopg2://{os.getenv('POSTGRES_USER')}:"
+    f"{os.getenv('POSTGRES_PASSWORD')}@localhost:"
+    f"{os.getenv('POSTGRES_PORT')}/{os.getenv('POSTGRES_DB')}",
+    future=True,
+)
+
+COPY_BATCH_ROWS = 100_000
+COPY_NULL = r"\N"
+
+# =====================
+# SQL
+# =====================
+
+FETCH_INPUTS = """
+SELECT
+    source_system,
+    source_record_id,
+    normalized_email,
+    normalized_phone,
+    normalized_name
+FROM staging.identity_inputs
+"""
+
+RECREATE_BLOCKED = """
+DROP TABLE IF EXISTS staging.identity_match_candidates_blocked;
+
+CREATE TABLE staging.identity_match_candidates_blocked (
+    left_source_system TEXT,
+    left_record_id TEXT,
+    left_email TEXT,
+    left_phone TEXT,
+    left_name TEXT,
+    right_source_system TEXT,
+    right_record_id TEXT,
+    right_email TEXT,
+    right_phone TEXT,
+    right_name TEXT
+);
+"""
+
+BLOCKED_INDEXES = """
+CREATE INDEX idx_blocked_left_record
+    ON staging.identity_match_candidates_blocked (left_source_system, left_record_id);
+
+CREATE INDEX idx_blocked_right_record
+    ON staging.identity_match_candidates_blocked (right_source_system, right_record_id);
+"""
+
+TRUNCATE_BLOCK_INDEX = """
+TRUNCATE
+    staging.identity_block_index,
+    staging.identity_block_records,
+    staging.identity_block_index_state
+"""
+
+SAVE_INDEX_STATE = """
+INSERT INTO staging.identity_block_index_state
+    (
+        built_by,
+        key_types,
+        max_block_size,
+        uncapped_key_types,
+        neighbourhood_window,
+        built_at
+    )
+VALUES (
+    :built_by,
+    :key_types,
+    :max_block_size,
+    :uncapped_key_types,
+    :neighbourhood_window,
+    NOW()
+)
+"""
+
+FETCH_INDEX_STATE = """
+SELECT
+    built_by,
+    key_types,
+    max_block_size,
+    uncapped_key_types,
+    neighbourhood_window
+FROM staging.identity_block_index_state
+"""
+
+# --- incremental mode ---
+
+FETCH_NEW_INPUTS = """
+SELECT
+    i.source_system,
+    i.source_record_id,
+    i.normalized_email,
+    i.normalized_phone,
+    i.normalized_name
+FROM staging.identity_inputs i
+WHERE NOT EXISTS (
+    SELECT 1
+    FROM staging.identity_block_records r
+    WHERE r.source_system = i.source_system
+      AND r.source_record_id = i.source_record_id
+)
+"""
+
+CREATE_TMP_NEW = """
+CREATE TEMP TABLE tmp_block_keys (
+    key_type TEXT,
+    key_value TEXT,
+    source_system TEXT,
+    source_record_id TEXT
+) ON COMMIT DROP;
+
+CREATE TEMP TABLE tmp_block_records (
+    source_system TEXT,
+    source_record_id TEXT
+) ON COMMIT DROP;
+"""
+
+EXTEND_BLOCK_INDEX = """
+INSERT INTO staging.identity_block_index
+SELECT DISTINCT key_type, key_value, source_system, source_record_id
+FROM tmp_block_keys
+ON CONFLICT DO NOTHING;
+
+INSERT INTO staging.identity_block_records
+SELECT source_system, source_record_id
+FROM tmp_block_records
+ON CONFLICT DO NOTHING;
+"""
+
+# pairs with at least one new record: new keys are looked up in the
+# (already extended) index, so new x old and new x new pairs come from
+# the same join; blocks over the size cap are skipped as in the full run
+# that built the index (no cap, or none for some key types, when it had
+# none)
+APPEND_NEW_PAIRS = """
+INSERT INTO staging.identity_match_candidates_blocked
+WITH blocks AS (
+    SELECT b.key_type, b.key_value
+    FROM (SELECT DISTINCT key_type, key_value FROM tmp_block_keys) n
+    JOIN staging.identity_block_index b
+      ON b.key_type = n.key_type
+     AND b.key_value = n.key_value
+    GROUP BY b.key_type, b.key_value
+    HAVING COUNT(*) >= 2
+       AND (
+            :max_block_size IS NULL
+         OR COUNT(*) <= :max_block_size
+         OR b.key_type = ANY(:uncapped_key_types)
+       )
+),
+edges AS (
+    SELECT
+        n.source_system AS a_source,
+        n.source_record_id AS a_id,
+        o.source_system AS b_source,
+        o.source_record_id AS b_id
+    FROM tmp_block_keys n
+    JOIN blocks k
+      ON k.key_type = n.key_type
+     AND k.key_value = n.key_value
+    JOIN staging.identity_block_index o
+      ON o.key_type = n.key_type
+     AND o.key_value = n.key_value
+     AND o.source_system <> n.source_system
+),
+pairs AS (
+    SELECT a_source, a_id, b_source, b_id FROM edges WHERE a_id < b_id
+    UNION
+    SELECT b_source, b_id, a_source, a_id FROM edges WHERE b_id < a_id
+)
+SELECT
+    l.source_system,
+    l.source_record_id,
+    l.normalized_email,
+    l.normalized_phone,
+    l.normalized_name,
+    r.source_system,
+    r.source_record_id,
+    r.normalized_email,
+    r.normalized_phone,
+    r.normalized_name
+FROM pairs p
+JOIN staging.identity_inputs l
+  ON l.source_system = p.a_source
+ AND l.source_record_id = p.a_id
+JOIN staging.identity_inputs r
+  ON r.source_system = p.b_source
+ AND r.source_record_id = p.b_id
+"""
+
+# =====================
+# IO
+# =====================
+
+def load_records(conn, query=FETCH_INPUTS):
+    result = conn.execution_options(
+        stream_results=True, yield_per=COPY_BATCH_ROWS
+    ).execute(text(query))
+    return [tuple(row) for row in result]
+
+def copy_rows(conn, table, rows):
+    """COPY row tuples into `table` in batches of COPY_BATCH_ROWS."""
+    cursor = conn.connection.cursor()
+    written = 0
+
+    def flush(buffer):
+        buffer.seek(0)
+        cursor.copy_expert(
+            f"COPY {table} FROM STDIN "
+            f"WITH (FORMAT csv, NULL '{COPY_NULL}')",
+            buffer
+        )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    batch = 0
+
+    for row in rows:
+        writer.writerow([COPY_NULL if v is None else v for v in row])
+        batch += 1
+
+        if batch >= COPY_BATCH_ROWS:
+            flush(buffer)
+            written += batch
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            batch = 0
+
+    if batch:
+        flush(buffer)
+        written += batch
+
+    return written
+
+def copy_pairs(conn, records, pairs):
+    """COPY (left, right) index pairs into the blocked candidates table."""
+    return copy_rows(
+        conn,
+        "staging.identity_match_candidates_blocked",
+        (records[left] + records[right] for left, right in pairs),
+    )
+
+def index_rows(index):
+    """(key_type, key_value, source_system, source_record_id) rows."""
+    for key_type, keys in index.keys.items():
+        for record, record_keys in zip(index.records, keys):
+            for key in record_keys:
+                yield key_type, key, record[SOURCE], record[RECORD_ID]
+
+def save_block_index(conn, index, replace=True):
+    """Persist the keys of the indexed records for incremental runs."""
+    if replace:
+        conn.execute(text(TRUNCATE_BLOCK_INDEX))
+        keys_table, records_table = (
+            "staging.identity_block_index", "staging.identity_block_records"
+        )
+    else:
+        conn.execute(text(CREATE_TMP_NEW))
+        keys_table, records_table = "tmp_block_keys", "tmp_block_records"
+
+    keys = copy_rows(conn, keys_table, index_rows(index))
+    copy_rows(conn, records_table, ((r[SOURCE], r[RECORD_ID]) for r in index.records))
+    return keys
+
+def save_index_state(conn, index):
+    """Record how a full run built the index, for incremental runs."""
+    uncapped = [
+        t for t in index.key_types if not index.capped(t, float("inf"))
+    ]
+    conn.execute(text(SAVE_INDEX_STATE), {
+        "built_by": "python",
+        "key_types": index.key_types,
+        "max_block_size": index.max_block_size,
+        "uncapped_key_types": uncapped,
+        "neighbourhood_window": index.window if index.window > 1 else 0,
+    })
+
+def load_index_state(conn, key_types=None, max_block_size=None):
+    """
+    (key_types, max_block_size, uncapped_key_types) of the full run that
+    built the index. Raises when there is none, when the requested key
+    types or cap differ from it, or when it had a sorted-neighbourhood
+    pass, which new records cannot join.
+    """
+    state = conn.execute(text(FETCH_INDEX_STATE)).first()
+    if state is None:
+        raise RuntimeError(
+            "no block index state: run a full blocking first "
+            "(engine, phase_4_5_blocking.sql or run_parallel_blocking.py)"
+        )
+
+    built_by, built_keys, built_cap, uncapped, window = state
+    if window:
+        raise RuntimeError(
+            f"block index was built by a {built_by} run with "
+            f"--sorted-neighbourhood {window}, which incremental runs "
+            f"cannot extend: run a full blocking"
+        )
+    if key_types is not None and sorted(key_types) != sorted(built_keys):
+        raise RuntimeError(
+            f"block index was built by a {built_by} run over "
+            f"{', '.join(built_keys)}, not {', '.join(key_types)}"
+        )
+    if max_block_size is not None and max_block_size != built_cap:
+        raise RuntimeError(
+            f"block index was built by a {built_by} run with block size "
+            f"cap {built_cap if built_cap is not None else 'none'}, "
+            f"not {max_block_size}"
+        )
+
+    return list(built_keys), built_cap, list(uncapped)
+
+# =====================
+# RUNNER
+# =====================
+
+def run_blocking_engine(
+    key_types=DEFAULT_KEY_TYPES,
+    max_block_size=DEFAULT_MAX_BLOCK_SIZE,
+    representative=False,
+    window=0,
+):
+    mode = "representative" if representative else "full pairs"
+    print(f"▶ Phase 4.5: Blocking (in-memory inverted index, {mode})")
+
+    with engine.begin() as conn:
+        started = time.perf_counter()
+        records = load_records(conn)
+        print(f"  {len(records)} identity inputs loaded")
+
+        index = BlockIndex(
+            records, key_types, max_block_size, representative, window
+        )
+        print(
+            f"  index built over {', '.join(key_types)} "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        if window > 1:
+            print(f"  sorted-neighbourhood window: {window} records by name")
+
+        conn.execute(text(RECREATE_BLOCKED))
+        written = copy_pairs(
+            conn,
+            records,
+            tqdm(index.pairs(), desc="Streaming candidate pairs", unit="pair"),
+        )
+        conn.execute(text(BLOCKED_INDEXES))
+
+        keys = save_block_index(conn, index)
+        save_index_state(conn, index)
+        print(f"  block index saved: {keys} keys")
+
+    index.report()
+    print(
+        f"✅ Phase 4.5 completed — {written} candidate pairs "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+
+def run_incremental_blocking(key_types=None, max_block_size=None):
+    """
+    Block only the identity inputs that are not in the persistent block
+    index yet, against the index and each other, and append their pairs
+    to the blocked candidates table. Key types and block size cap are
+    those of the last full run, which (re)built the index; passing
+    others raises.
+    """
+    print("▶ Phase 4.5: Blocking (incremental, persistent block index)")
+
+    with engine.begin() as conn:
+        started = time.perf_counter()
+        key_types, max_block_size, uncapped = load_index_state(
+            conn, key_types, max_block_size
+        )
+        cap = max_block_size if max_block_size is not None else "none"
+        print(f"  keys: {', '.join(key_types)}, block size cap: {cap}")
+
+        records = load_records(conn, FETCH_NEW_INPUTS)
+        print(f"  {len(records)} new identity inputs")
+
+        if not records:
+            print("✅ Phase 4.5 completed — nothing new to block")
+            return
+
+        # keys of the new records only; pairs are built in SQL
+        index = BlockIndex(records, key_types)
+        keys = save_block_index(conn, index, replace=False)
+        conn.execute(text(EXTEND_BLOCK_INDEX))
+        print(f"  block index extended with {keys} keys")
+
+        written = conn.execute(
+            text(APPEND_NEW_PAIRS),
+            {"max_block_size": max_block_size, "uncapped_key_types": uncapped},
+        ).rowcount
+
+    print(
+        f"✅ Phase 4.5 completed — {written} candidate pairs appended "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Phase 4.5 blocking engine")
+    parser.add_argument(
+        "--keys",
+        help=(
+            f"comma-separated key types ({', '.join(KEY_FUNCTIONS)}); "
+            f"default {','.join(DEFAULT_KEY_TYPES)}, or those of the "
+            f"index with --incremental"
+        )
+    )
+    parser.add_argument(
+        "--max-block-size",
+        type=int,
+        help=(
+            f"blocks with more records are skipped and logged; default "
+            f"{DEFAULT_MAX_BLOCK_SIZE}, or the cap of the index with "
+            f"--incremental"
+        )
+    )
+    parser.add_argument(
+        "--representative",
+        action="store_true",
+        help=(
+            "link members of exact-key (email/phone) blocks to a "
+            "representative: O(n) instead of O(n²) pairs per block"
+        )
+    )
+    parser.add_argument(
+        "--sorted-neighbourhood",
+        type=int,
+        default=0,
+        metavar="WINDOW",
+        help=(
+            "also pair each named record with the next WINDOW - 1 records "
+            "in surname-first name order (0 = off)"
+        )
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "only block records not yet in the persistent block index "
+            "and append their pairs, with the key types and cap of the "
+            "full run that built the index"
+        )
+    )
+    args = parser.parse_args()
+
+    key_types = (
+        [k.strip() for k in args.keys.split(",") if k.strip()]
+        if args.keys else None
+    )
+    unknown = set(key_types or ()) - set(KEY_FUNCTIONS)
+    if unknown:
+        parser.error(f"unknown key types: {', '.join(sorted(unknown))}")
+
+    if args.incremental:
+        if args.representative or args.sorted_neighbourhood:
+            parser.error(
+                "--incremental emits full key pairs; it cannot be combined "
+                "with --representative or --sorted-neighbourhood"
+            )
+        run_incremental_blocking(key_types, args.max_block_size)
+    else:
+        run_blocking_engine(
+            key_types or DEFAULT_KEY_TYPES,
+            args.max_block_size or DEFAULT_MAX_BLOCK_SIZE,
+            args.representative,
+            args.sorted_neighbourhood,
+        )
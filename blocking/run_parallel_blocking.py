@@ -0,0 +1,256 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from sqlalchemy import create_engine, text
+import os
+from dotenv import load_dotenv
+
+# =====================
+# ENV & ENGINE
+# =====================
+
+load_dotenv()
+
+DEFAULT_PARTITIONS = 8
+DEFAULT_WORKERS = 4
+
+engine = create_engine(
+    f"postgresql+psycopg2://{os.getenv('POSTGRES_USER')}:"
+    f"{os.getenv('POSTGRES_PASSWORD')}@localhost:"
+    f"{os.getenv('POSTGRES_PORT')}/{os.getenv('POSTGRES_DB')}",
+    future=True,
+    pool_size=DEFAULT_WORKERS,
+)
+
+# =====================
+# SQL
+# =====================
+# The OR in the Phase 4.5 self-join (email = email OR phone = phone)
+# cannot use either index, so it runs as one serial nested loop. Here
+# each key gets its own equi-join, and identity_inputs is first split by
+# hash of the key into partitions that are joined independently, over
+# several connections. A pair lands in exactly one (key, partition)
+# task: the phone join skips pairs the email join already produced.
+
+KEY_COLUMNS = {"email": "normalized_email", "phone": "normalized_phone"}
+
+RECREATE_KEY_TABLE = """
+DROP TABLE IF EXISTS staging.blocking_keys_{key};
+
+CREATE TABLE staging.blocking_keys_{key} (
+    block_key TEXT NOT NULL,
+    source_system TEXT,
+    source_record_id TEXT,
+    normalized_email TEXT,
+    normalized_phone TEXT,
+    normalized_name TEXT
+) PARTITION BY HASH (block_key);
+"""
+
+# scratch partitions: no WAL, dropped after the run
+CREATE_KEY_PARTITION = """
+CREATE UNLOGGED TABLE staging.blocking_keys_{key}_p{partition}
+PARTITION OF staging.blocking_keys_{key}
+FOR VALUES WITH (MODULUS {partitions}, REMAINDER {partition})
+"""
+
+LOAD_KEY_TABLE = """
+INSERT INTO staging.blocking_keys_{key}
+SELECT
+    {column},
+    source_system,
+    source_record_id,
+    normalized_email,
+    normalized_phone,
+    normalized_name
+FROM staging.identity_inputs
+WHERE {column} IS NOT NULL
+"""
+
+RECREATE_BLOCKED = """
+DROP TABLE IF EXISTS staging.identity_match_candidates_blocked;
+
+CREATE TABLE staging.identity_match_candidates_blocked (
+    left_source_system TEXT,
+    left_record_id TEXT,
+    left_email TEXT,
+    left_phone TEXT,
+    left_name TEXT,
+    right_source_system TEXT,
+    right_record_id TEXT,
+    right_email TEXT,
+    right_phone TEXT,
+    right_name TEXT
+) PARTITION BY HASH (left_record_id);
+"""
+
+CREATE_BLOCKED_PARTITION = """
+CREATE TABLE staging.identity_match_candidates_blocked_p{partition}
+PARTITION OF staging.identity_match_candidates_blocked
+FOR VALUES WITH (MODULUS {partitions}, REMAINDER {partition})
+"""
+
+BLOCK_PARTITION = """
+INSERT INTO staging.identity_match_candidates_blocked
+SELECT
+    a.source_system,
+    a.source_record_id,
+    a.normalized_email,
+    a.normalized_phone,
+    a.normalized_name,
+    b.source_system,
+    b.source_record_id,
+    b.normalized_email,
+    b.normalized_phone,
+    b.normalized_name
+FROM staging.blocking_keys_{key}_p{partition} a
+JOIN staging.blocking_keys_{key}_p{partition} b
+  ON a.block_key = b.block_key
+ AND a.source_system <> b.source_system
+ AND a.source_record_id < b.source_record_id
+{exclude}
+"""
+
+# phone pairs that also share an email come from the email join
+EXCLUDE = {
+    "email": "",
+    "phone": "WHERE NOT COALESCE(a.normalized_email = b.normalized_email, FALSE)",
+}
+
+BLOCKED_INDEXES = """
+CREATE INDEX idx_blocked_left_record
+    ON staging.identity_match_candidates_blocked (left_source_system, left_record_id);
+
+CREATE INDEX idx_blocked_right_record
+    ON staging.identity_match_candidates_blocked (right_source_system, right_record_id);
+
+ANALYZE staging.identity_match_candidates_blocked;
+"""
+
+DROP_KEY_TABLE = "DROP TABLE IF EXISTS staging.blocking_keys_{key}"
+
+# persistent block index (blocking/run_blocking_engine.py --incremental),
+# rebuilt from the key tables before they are dropped; blocks were not
+# capped
+TRUNCATE_BLOCK_INDEX = """
+TRUNCATE
+    staging.identity_block_index,
+    staging.identity_block_records,
+    staging.identity_block_index_state
+"""
+
+LOAD_BLOCK_INDEX = """
+INSERT INTO staging.identity_block_index
+SELECT DISTINCT '{key}', block_key, source_system, source_record_id
+FROM staging.blocking_keys_{key}
+"""
+
+LOAD_BLOCK_RECORDS = """
+INSERT INTO staging.identity_block_records
+SELECT DISTINCT source_system, source_record_id
+FROM staging.identity_inputs
+"""
+
+SAVE_INDEX_STATE = """
+INSERT INTO staging.identity_block_index_state
+    (built_by, key_types, max_block_size, built_at)
+VALUES ('parallel', :key_types, NULL, NOW())
+"""
+
+# =====================
+# TASKS
+# =====================
+
+def prepare(partitions):
+    """Create the partitioned key and candidate tables, load the keys."""
+    with engine.begin() as conn:
+        conn.execute(text(RECREATE_BLOCKED))
+        for p in range(partitions):
+            conn.execute(text(CREATE_BLOCKED_PARTITION.format(
+                partition=p, partitions=partitions
+            )))
+
+        for key, column in KEY_COLUMNS.items():
+            conn.execute(text(RECREATE_KEY_TABLE.format(key=key)))
+            for p in range(partitions):
+                conn.execute(text(CREATE_KEY_PARTITION.format(
+                    key=key, partition=p, partitions=partitions
+                )))
+            conn.execute(text(LOAD_KEY_TABLE.format(key=key, column=column)))
+            conn.execute(text(f"ANALYZE staging.blocking_keys_{key}"))
+
+def block_partition(key, partition):
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        rows = conn.execute(text(BLOCK_PARTITION.format(
+            key=key, partition=partition, exclude=EXCLUDE[key]
+        ))).rowcount
+    return key, partition, rows, time.perf_counter() - started
+
+def finalize():
+    """Index the candidates, rebuild the block index, drop the key tables."""
+    with engine.begin() as conn:
+        conn.execute(text(BLOCKED_INDEXES))
+
+        conn.execute(text(TRUNCATE_BLOCK_INDEX))
+        for key in KEY_COLUMNS:
+            conn.execute(text(LOAD_BLOCK_INDEX.format(key=key)))
+        conn.execute(text(LOAD_BLOCK_RECORDS))
+        conn.execute(text(SAVE_INDEX_STATE), {"key_types": list(KEY_COLUMNS)})
+
+        for key in KEY_COLUMNS:
+            conn.execute(text(DROP_KEY_TABLE.format(key=key)))
+
+# =====================
+# RUNNER
+# =====================
+
+def run_parallel_blocking(partitions=DEFAULT_PARTITIONS, workers=DEFAULT_WORKERS):
+    print(
+        f"▶ Phase 4.5: Blocking (SQL, {partitions} hash partitions "
+        f"x {len(KEY_COLUMNS)} keys, {workers} connections)"
+    )
+    started = time.perf_counter()
+
+    prepare(partitions)
+    print(f"  key tables partitioned in {time.perf_counter() - started:.2f}s")
+
+    totals = dict.fromkeys(KEY_COLUMNS, 0)
+    tasks = [(key, p) for key in KEY_COLUMNS for p in range(partitions)]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(block_partition, key, p) for key, p in tasks]
+        for future in as_completed(futures):
+            key, partition, rows, seconds = future.result()
+            totals[key] += rows
+            print(f"  {key} p{partition}: {rows} pairs in {seconds:.2f}s")
+
+    finalize()
+
+    for key, rows in totals.items():
+        print(f"  {key:<6} pairs={rows}")
+    print(
+        f"✅ Phase 4.5 completed — {sum(totals.values())} candidate pairs "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return sum(totals.values())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Phase 4.5 blocking as hash-partitioned parallel SQL"
+    )
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        default=DEFAULT_PARTITIONS,
+        help="hash partitions per blocking key"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="concurrent database connections"
+    )
+    args = parser.parse_args()
+
+    run_parallel_blocking(args.partitions, args.workers)
@@ -29,3 +29,9 @@ CREATE TABLE IF NOT EXISTS staging.identity_inputs (
     normalized_name TEXT,
     event_ts TIMESTAMP
 );
+
+-- last raw ingestion_ts normalized into each stg_* table (Phase 3)
+CREATE TABLE IF NOT EXISTS staging.staging_watermarks (
+    table_name TEXT PRIMARY KEY,
+    last_ingestion_ts TIMESTAMP NOT NULL
+);
@@ -16,3 +16,30 @@ CREATE TABLE IF NOT EXISTS identity.customer_identity_map (
     decided_at TIMESTAMP,
     PRIMARY KEY (source_system, source_record_id)
 );
+
+CREATE TABLE IF NOT EXISTS identity.ingestion_object_offsets (
+    object_name TEXT PRIMARY KEY,
+    source_system TEXT NOT NULL,
+    -- where a chunked load resumes, in offset_unit: decompressed
+    -- bytes for JSONL objects, rows for Parquet
+    resume_offset BIGINT NOT NULL DEFAULT 0,
+    offset_unit TEXT NOT NULL DEFAULT 'bytes',  -- bytes | rows
+    rows_loaded BIGINT NOT NULL DEFAULT 0,
+    completed BOOLEAN NOT NULL DEFAULT false,
+    updated_at TIMESTAMP DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS identity.ingestion_manifest (
+    object_name TEXT PRIMARY KEY,
+    source_system TEXT NOT NULL,
+    etag TEXT,
+    size_bytes BIGINT,
+    row_count BIGINT,
+    status TEXT NOT NULL,  -- running | done | failed
+    error TEXT,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingestion_manifest_source
+ON identity.ingestion_manifest (source_system, status);
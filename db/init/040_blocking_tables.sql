@@ -10,3 +10,39 @@ CREATE TABLE IF NOT EXISTS staging.identity_match_candidates_blocked (
     right_phone TEXT,
     right_name TEXT
 );
+
+-- persistent block-key index: rebuilt by every full blocking run
+-- (engine, phase_4_5_blocking.sql, run_parallel_blocking.py), extended
+-- by engine --incremental runs with the keys of the records that
+-- arrived since
+CREATE TABLE IF NOT EXISTS staging.identity_block_index (
+    key_type TEXT NOT NULL,
+    key_value TEXT NOT NULL,
+    source_system TEXT NOT NULL,
+    source_record_id TEXT NOT NULL,
+    PRIMARY KEY (key_type, key_value, source_system, source_record_id)
+);
+
+-- identity inputs already blocked, including records without any key
+CREATE TABLE IF NOT EXISTS staging.identity_block_records (
+    source_system TEXT NOT NULL,
+    source_record_id TEXT NOT NULL,
+    PRIMARY KEY (source_system, source_record_id)
+);
+
+-- how the block index was last rebuilt (one row). --incremental runs
+-- reuse its key types and block size cap, and refuse to run without it.
+--   built_by            python, sql or parallel
+--   max_block_size      NULL = blocks were not capped
+--   uncapped_key_types  key types whose blocks were never capped
+--                       (exact keys of a --representative run)
+--   neighbourhood_window  --sorted-neighbourhood window, 0 = off;
+--                       incremental runs cannot extend it and refuse
+CREATE TABLE IF NOT EXISTS staging.identity_block_index_state (
+    built_by TEXT NOT NULL,
+    key_types TEXT[] NOT NULL,
+    max_block_size INT,
+    uncapped_key_types TEXT[] NOT NULL DEFAULT '{}',
+    neighbourhood_window INT NOT NULL DEFAULT 0,
+    built_at TIMESTAMP NOT NULL
+);
@@ -10,3 +10,39 @@ CREATE TABLE IF NOT EXISTS staging.identity_match_candidates (
     match_decision TEXT,
     evaluated_at TIMESTAMP
 );
+
+-- ======================================
+-- PHASE 5 SCORING RULES (matching/scoring_rules.py)
+-- ======================================
+
+-- one check per attribute: exact equality or name similarity >= threshold
+CREATE TABLE IF NOT EXISTS gold.match_scoring_rules (
+    attribute_name  TEXT PRIMARY KEY,
+    comparison      TEXT NOT NULL,
+    weight          INT  NOT NULL,
+    threshold       NUMERIC,
+    forces_decision TEXT
+);
+
+-- a pair gets the strongest (lowest rank) decision whose min_score its
+-- total reaches, or that one of its matching rules forces
+CREATE TABLE IF NOT EXISTS gold.match_decision_rules (
+    decision  TEXT PRIMARY KEY,
+    rank      INT  NOT NULL,
+    min_score INT
+);
+
+INSERT INTO gold.match_scoring_rules
+(attribute_name, comparison, weight, threshold, forces_decision)
+VALUES
+    ('email', 'exact',      70, NULL, 'AUTO_MERGE'),
+    ('phone', 'exact',      70, NULL, NULL),
+    ('name',  'similarity', 30, 0.85, NULL)
+ON CONFLICT DO NOTHING;
+
+INSERT INTO gold.match_decision_rules (decision, rank, min_score)
+VALUES
+    ('AUTO_MERGE',  1, NULL),
+    ('FLAG_REVIEW', 2, 65),
+    ('REJECT',      3, 0)
+ON CONFLICT DO NOTHING;
@@ -1,2 +1,28 @@
--- Reserved for future global identity helper tables or views
--- (intentionally empty for now)
+-- Identity graph: every matched edge Phase 6 has resolved. Incremental
+-- resolution only processes candidates that are not in here yet.
+CREATE TABLE IF NOT EXISTS identity.identity_graph_edges (
+    left_source_system TEXT NOT NULL,
+    left_record_id TEXT NOT NULL,
+    right_source_system TEXT NOT NULL,
+    right_record_id TEXT NOT NULL,
+    confidence_score INT,
+    decision TEXT,
+    resolved_at TIMESTAMP,
+    PRIMARY KEY (left_source_system, left_record_id, right_source_system, right_record_id)
+);
+
+-- Global customer ids changed by resolution runs since gold last
+-- consumed them (gold/run_golden_customers.py --changed-only), for the
+-- gold phases to rebuild only those customers. Runs add to it: a later
+-- merge or removal overrides an earlier change, and an id created and
+-- then updated stays created.
+--   created  new cluster
+--   updated  cluster gained or lost records, or absorbed other clusters
+--   merged   cluster absorbed into merged_into; the id no longer exists
+--   removed  a rebuild left none of the cluster's records matched
+CREATE TABLE IF NOT EXISTS identity.changed_global_ids (
+    global_customer_id UUID PRIMARY KEY,
+    change_type TEXT NOT NULL,
+    merged_into UUID,
+    changed_at TIMESTAMP
+);
@@ -4,5 +4,29 @@ ON staging.identity_inputs (normalized_email);
 CREATE INDEX IF NOT EXISTS idx_identity_inputs_phone
 ON staging.identity_inputs (normalized_phone);
 
+CREATE INDEX IF NOT EXISTS idx_identity_inputs_record
+ON staging.identity_inputs (source_system, source_record_id);
+
+-- incremental staging (Phase 3) reads raw rows past its watermark
+CREATE INDEX IF NOT EXISTS idx_raw_sales_orders_ingestion_ts
+ON raw.sales_orders (ingestion_ts);
+
+CREATE INDEX IF NOT EXISTS idx_raw_support_tickets_ingestion_ts
+ON raw.support_tickets (ingestion_ts);
+
+CREATE INDEX IF NOT EXISTS idx_raw_marketing_leads_ingestion_ts
+ON raw.marketing_leads (ingestion_ts);
+
 CREATE INDEX IF NOT EXISTS idx_identity_map_gcid
 ON identity.customer_identity_map (global_customer_id);
+
+-- one staged row per source record; lets incremental staging and the
+-- fused ingestion mode skip rows that are already staged
+CREATE UNIQUE INDEX IF NOT EXISTS uq_stg_sales_customers_order
+ON staging.stg_sales_customers (order_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_stg_support_contacts_ticket
+ON staging.stg_support_contacts (ticket_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_stg_marketing_leads_lead
+ON staging.stg_marketing_leads (lead_id);
@@ -1,3 +1,4 @@
+import argparse
 import json
 from sqlalchemy import create_engine, text
 from collections import Counter
@@ -70,25 +71,70 @@ def resolve_attribute(rows, field, strategy, priority_map):
 # PHASE 7 RUNNER
 # =====================
 
-def run_phase_7():
-    print("▶ Phase 7 — Golden Record Construction")
+IDENTITY_ROWS_SQL = """
+SELECT
+    m.global_customer_id,
+    i.source_system,
+    i.normalized_email,
+    i.normalized_phone,
+    i.normalized_name,
+    i.event_ts
+FROM identity.customer_identity_map m
+JOIN staging.identity_inputs i
+  ON m.source_system = i.source_system
+ AND m.source_record_id = i.source_record_id
+"""
+
+# global ids Phase 6 changed since the last --changed-only run
+FETCH_CHANGES_SQL = """
+SELECT global_customer_id::text, change_type, changed_at
+FROM identity.changed_global_ids
+"""
+
+# only the created and updated customers among them
+CHANGED_IDENTITY_ROWS_SQL = IDENTITY_ROWS_SQL + """
+WHERE m.global_customer_id = ANY(CAST(:global_ids AS uuid[]))
+"""
+
+DELETE_CHANGED_SQL = """
+DELETE FROM gold.dim_customers
+WHERE global_customer_id = ANY(CAST(:global_ids AS uuid[]))
+"""
+
+# consumed changes only: an id Phase 6 changed again meanwhile has a
+# newer changed_at and stays for the next run
+CONSUME_CHANGES_SQL = """
+DELETE FROM identity.changed_global_ids c
+USING unnest(
+    CAST(:global_ids AS uuid[]),
+    CAST(:changed_at AS timestamp[])
+) AS d (global_customer_id, changed_at)
+WHERE c.global_customer_id = d.global_customer_id
+  AND c.changed_at = d.changed_at
+"""
+
+def run_phase_7(changed_only=False):
+    print(
+        "▶ Phase 7 — Golden Record Construction"
+        f"{' (changed global ids only)' if changed_only else ''}"
+    )
 
     with engine.begin() as conn:
         priority_map, strategy_map = load_survivorship_config(conn)
 
-        identity_rows = conn.execute(text("""
-            SELECT
-                m.global_customer_id,
-                i.source_system,
-                i.normalized_email,
-                i.normalized_phone,
-                i.normalized_name,
-                i.event_ts
-            FROM identity.customer_identity_map m
-            JOIN staging.identity_inputs i
-              ON m.source_system = i.source_system
-             AND m.source_record_id = i.source_record_id
-        """)).mappings().all()
+        if changed_only:
+            changes = conn.execute(text(FETCH_CHANGES_SQL)).all()
+            rebuilt_ids = [
+                gcid for gcid, change_type, _ in changes
+                if change_type in ("created", "updated")
+            ]
+            identity_rows = conn.execute(
+                text(CHANGED_IDENTITY_ROWS_SQL), {"global_ids": rebuilt_ids}
+            ).mappings().all()
+        else:
+            identity_rows = conn.execute(
+                text(IDENTITY_ROWS_SQL)
+            ).mappings().all()
 
         grouped = {}
         for row in identity_rows:
@@ -123,8 +169,15 @@ def run_phase_7():
                 "updated_at": now_utc
             })
 
-        # rebuild safely
-        conn.execute(text("TRUNCATE gold.dim_customers"))
+        if changed_only:
+            # merged and removed ids disappear, the others are rebuilt below
+            conn.execute(
+                text(DELETE_CHANGED_SQL),
+                {"global_ids": [gcid for gcid, _, _ in changes]},
+            )
+        else:
+            # rebuild safely
+            conn.execute(text("TRUNCATE gold.dim_customers"))
 
         if results:
             conn.execute(text("""
@@ -147,8 +200,28 @@ def run_phase_7():
                 )
             """), results)
 
+    if changed_only:
+        # only once the rebuild is committed, so a failed run leaves the
+        # changes for the next one
+        with engine.begin() as conn:
+            conn.execute(text(CONSUME_CHANGES_SQL), {
+                "global_ids": [gcid for gcid, _, _ in changes],
+                "changed_at": [changed_at for _, _, changed_at in changes],
+            })
+
     print(f"✅ Phase 7 completed — {len(results)} golden customers created")
 
 
 if __name__ == "__main__":
-    run_phase_7()
+    parser = argparse.ArgumentParser(description="Phase 7 golden record construction")
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help=(
+            "rebuild only the customers in identity.changed_global_ids, "
+            "then clear the changes consumed"
+        )
+    )
+    args = parser.parse_args()
+
+    run_phase_7(args.changed_only)
@@ -0,0 +1,99 @@
+import zlib
+from multiprocessing import Pool
+
+from union_find import UnionFind, deterministic_global_id
+
+# =====================
+# PARTITIONED CONNECTED COMPONENTS
+# =====================
+# Edges are split into shards, each shard is reduced to a spanning forest
+# by a local union-find in a worker process, and the forests are merged
+# by one more union-find. A forest has at most one edge per record of its
+# shard, so the final pass sees far fewer edges than the graph has. The
+# components do not depend on how edges are sharded or in which order the
+# shards finish, so ids are assigned the deterministic way: the UUIDv5 of
+# each component's smallest record.
+#
+# Per record, the score and decision kept are those of its strongest edge
+# (highest score, then decision), which, unlike "first edge", does not
+# depend on the order edges are read in.
+
+def shard_of(record, shards):
+    """Stable shard of a (source_system, source_record_id) record."""
+    source_system, source_record_id = record
+    return zlib.crc32(f"{source_system}/{source_record_id}".encode()) % shards
+
+def shard_edges(edges, shards):
+    """Split (left, right, score, decision) edges by their left record."""
+    sharded = [[] for _ in range(shards)]
+    for edge in edges:
+        sharded[shard_of(edge[0], shards)].append(edge)
+    return sharded
+
+def local_forest(edges):
+    """
+    Spanning forest of one shard: (record, root) for every record that is
+    not its component's root, and the strongest (score, decision) of
+    every record.
+    """
+    sets = UnionFind()
+    strongest = {}
+
+    for left, right, score, decision in edges:
+        sets.add(left)
+        sets.add(right)
+        sets.union(left, right)
+        for record in (left, right):
+            value = (score, decision)
+            if record not in strongest or value > strongest[record]:
+                strongest[record] = value
+
+    forest = []
+    for record in sets.parent:
+        root = sets.find(record)
+        if root != record:
+            forest.append((record, root))
+
+    return forest, strongest
+
+def merge_forests(results):
+    """Reduce local_forest() results into one union-find."""
+    sets = UnionFind()
+    strongest = {}
+
+    for forest, shard_strongest in results:
+        for record, value in shard_strongest.items():
+            sets.add(record)
+            if record not in strongest or value > strongest[record]:
+                strongest[record] = value
+        for record, root in forest:
+            sets.union(record, root)
+
+    return sets, strongest
+
+def component_assignment(sets, strongest):
+    """record -> (global id, confidence_score, decision)."""
+    smallest = {}
+    for record in sets.parent:
+        root = sets.find(record)
+        if root not in smallest or record < smallest[root]:
+            smallest[root] = record
+
+    global_ids = {
+        root: deterministic_global_id(record) for root, record in smallest.items()
+    }
+    return {
+        record: (global_ids[sets.find(record)], *strongest[record])
+        for record in sets.parent
+    }
+
+def parallel_components(tasks, forest_function=local_forest, workers=4):
+    """
+    Run forest_function over tasks (one per shard) in a process pool and
+    merge the forests as they complete; returns merge_forests() output.
+    """
+    if workers <= 1:
+        return merge_forests(map(forest_function, tasks))
+
+    with Pool(workers) as pool:
+        return merge_forests(pool.imap_unordered(forest_function, tasks))
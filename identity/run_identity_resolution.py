@@ -1,3 +1,7 @@
+import argparse
+import csv
+import io
+import time
 from sqlalchemy import create_engine, text
 from datetime import datetime, timezone
 import uuid
@@ -5,6 +9,15 @@ import os
 from dotenv import load_dotenv
 from tqdm import tqdm
 
+from parallel_components import component_assignment, local_forest, parallel_components
+from union_find import (
+    ID_STRATEGIES,
+    changed_global_ids,
+    diff_assignments,
+    resolve_components,
+    resolve_edges,
+)
+
 # =====================
 # ENV & ENGINE
 # =====================
@@ -18,6 +31,13 @@ engine = create_engine(
     future=True,
 )
 
+# matched edges read per round trip in union-find modes
+BATCH_ROWS = 50_000
+# parallel mode: edge shards, each read and reduced by one task
+DEFAULT_SHARDS = 16
+DEFAULT_WORKERS = 4
+COPY_NULL = r"\N"
+
 # =====================
 # SQL
 # =====================
@@ -61,6 +81,329 @@ VALUES (
 ON CONFLICT DO NOTHING
 """
 
+FETCH_EDGES = """
+SELECT
+    left_source_system,
+    left_record_id,
+    right_source_system,
+    right_record_id,
+    total_confidence_score,
+    match_decision
+FROM staging.identity_match_candidates
+WHERE match_decision IN ('AUTO_MERGE', 'FLAG_REVIEW')
+"""
+
+# parallel mode: one hash shard of the matched edges, by left record;
+# masked rather than abs(), which overflows on hashtext() = -2^31
+FETCH_EDGE_SHARD = FETCH_EDGES + """
+  AND (hashtext(left_source_system || '/' || left_record_id) & 2147483647) % :shards = :shard
+"""
+
+# current global ids of the records the matched edges touch
+FETCH_EDGE_RECORD_IDS = """
+SELECT m.source_system, m.source_record_id, m.global_customer_id::text
+FROM identity.customer_identity_map m
+JOIN (
+    SELECT left_source_system AS source_system, left_record_id AS source_record_id
+    FROM staging.identity_match_candidates
+    WHERE match_decision IN ('AUTO_MERGE', 'FLAG_REVIEW')
+    UNION
+    SELECT right_source_system, right_record_id
+    FROM staging.identity_match_candidates
+    WHERE match_decision IN ('AUTO_MERGE', 'FLAG_REVIEW')
+) e
+  ON e.source_system = m.source_system
+ AND e.source_record_id = m.source_record_id
+"""
+
+# incremental mode: matched candidates not in the identity graph yet,
+# numbered in resolution order
+CREATE_NEW_EDGES = """
+CREATE TEMP TABLE tmp_new_edges (
+    edge_order BIGSERIAL,
+    left_source_system TEXT,
+    left_record_id TEXT,
+    right_source_system TEXT,
+    right_record_id TEXT,
+    confidence_score INT,
+    decision TEXT
+) ON COMMIT DROP;
+
+INSERT INTO tmp_new_edges (
+    left_source_system,
+    left_record_id,
+    right_source_system,
+    right_record_id,
+    confidence_score,
+    decision
+)
+SELECT
+    c.left_source_system,
+    c.left_record_id,
+    c.right_source_system,
+    c.right_record_id,
+    c.total_confidence_score,
+    c.match_decision
+FROM staging.identity_match_candidates c
+WHERE c.match_decision IN ('AUTO_MERGE', 'FLAG_REVIEW')
+  AND NOT EXISTS (
+      SELECT 1
+      FROM identity.identity_graph_edges g
+      WHERE g.left_source_system = c.left_source_system
+        AND g.left_record_id = c.left_record_id
+        AND g.right_source_system = c.right_source_system
+        AND g.right_record_id = c.right_record_id
+  );
+"""
+
+FETCH_NEW_EDGES = """
+SELECT
+    left_source_system,
+    left_record_id,
+    right_source_system,
+    right_record_id,
+    confidence_score,
+    decision
+FROM tmp_new_edges
+ORDER BY edge_order
+"""
+
+FETCH_NEW_EDGE_RECORD_IDS = """
+SELECT m.source_system, m.source_record_id, m.global_customer_id::text
+FROM identity.customer_identity_map m
+JOIN (
+    SELECT left_source_system AS source_system, left_record_id AS source_record_id
+    FROM tmp_new_edges
+    UNION
+    SELECT right_source_system, right_record_id
+    FROM tmp_new_edges
+) e
+  ON e.source_system = m.source_system
+ AND e.source_record_id = m.source_record_id
+"""
+
+RECORD_NEW_EDGES = """
+INSERT INTO identity.identity_graph_edges (
+    left_source_system,
+    left_record_id,
+    right_source_system,
+    right_record_id,
+    confidence_score,
+    decision,
+    resolved_at
+)
+SELECT
+    left_source_system,
+    left_record_id,
+    right_source_system,
+    right_record_id,
+    confidence_score,
+    decision,
+    :resolved_at
+FROM tmp_new_edges
+ON CONFLICT DO NOTHING
+"""
+
+RECORD_ALL_EDGES = """
+INSERT INTO identity.identity_graph_edges (
+    left_source_system,
+    left_record_id,
+    right_source_system,
+    right_record_id,
+    confidence_score,
+    decision,
+    resolved_at
+)
+SELECT
+    left_source_system,
+    left_record_id,
+    right_source_system,
+    right_record_id,
+    total_confidence_score,
+    match_decision,
+    :resolved_at
+FROM staging.identity_match_candidates
+WHERE match_decision IN ('AUTO_MERGE', 'FLAG_REVIEW')
+ON CONFLICT DO NOTHING
+"""
+
+# resolved edges that Phase 5 has since re-scored as non-matches: their
+# clusters may have to split, which only a rebuild does
+COUNT_UNMATCHED_EDGES = """
+SELECT COUNT(*)
+FROM staging.identity_match_candidates c
+WHERE c.match_decision NOT IN ('AUTO_MERGE', 'FLAG_REVIEW')
+  AND EXISTS (
+      SELECT 1
+      FROM identity.identity_graph_edges g
+      WHERE g.left_source_system = c.left_source_system
+        AND g.left_record_id = c.left_record_id
+        AND g.right_source_system = c.right_source_system
+        AND g.right_record_id = c.right_record_id
+  )
+"""
+
+# rebuilds: the graph keeps only the edges the rebuild clustered
+PRUNE_GRAPH_EDGES = """
+DELETE FROM identity.identity_graph_edges g
+WHERE NOT EXISTS (
+    SELECT 1
+    FROM staging.identity_match_candidates c
+    WHERE c.match_decision IN ('AUTO_MERGE', 'FLAG_REVIEW')
+      AND c.left_source_system = g.left_source_system
+      AND c.left_record_id = g.left_record_id
+      AND c.right_source_system = g.right_source_system
+      AND c.right_record_id = g.right_record_id
+)
+"""
+
+CREATE_TMP_TABLES = """
+CREATE TEMP TABLE tmp_global_id_remap (
+    old_global_id UUID PRIMARY KEY,
+    new_global_id UUID NOT NULL
+) ON COMMIT DROP;
+
+CREATE TEMP TABLE tmp_identity_map
+(LIKE identity.customer_identity_map INCLUDING DEFAULTS)
+ON COMMIT DROP;
+"""
+
+APPLY_GLOBAL_ID_REMAP = """
+UPDATE identity.customer_identity_map m
+SET global_customer_id = r.new_global_id
+FROM tmp_global_id_remap r
+WHERE m.global_customer_id = r.old_global_id
+"""
+
+MERGE_IDENTITY_MAP = """
+INSERT INTO identity.customer_identity_map (
+    global_customer_id,
+    source_system,
+    source_record_id,
+    confidence_score,
+    decision,
+    decided_at
+)
+SELECT
+    global_customer_id,
+    source_system,
+    source_record_id,
+    confidence_score,
+    decision,
+    decided_at
+FROM tmp_identity_map
+ON CONFLICT DO NOTHING
+"""
+
+# deterministic ids: smallest member of each touched cluster
+FETCH_CLUSTER_MINS = """
+SELECT DISTINCT ON (global_customer_id)
+    global_customer_id::text,
+    source_system,
+    source_record_id
+FROM identity.customer_identity_map
+WHERE global_customer_id = ANY(CAST(:global_ids AS uuid[]))
+ORDER BY global_customer_id, source_system, source_record_id
+"""
+
+FETCH_IDENTITY_MAP = """
+SELECT source_system, source_record_id, global_customer_id::text
+FROM identity.customer_identity_map
+"""
+
+# rebuild: rows whose assignment changed; existing rows keep their
+# score, decision and decided_at
+UPSERT_IDENTITY_MAP = """
+INSERT INTO identity.customer_identity_map (
+    global_customer_id,
+    source_system,
+    source_record_id,
+    confidence_score,
+    decision,
+    decided_at
+)
+SELECT
+    global_customer_id,
+    source_system,
+    source_record_id,
+    confidence_score,
+    decision,
+    decided_at
+FROM tmp_identity_map
+ON CONFLICT (source_system, source_record_id)
+DO UPDATE SET global_customer_id = EXCLUDED.global_customer_id
+"""
+
+CREATE_TMP_DELETED = """
+CREATE TEMP TABLE tmp_deleted_records (
+    source_system TEXT,
+    source_record_id TEXT
+) ON COMMIT DROP
+"""
+
+DELETE_RECORDS = """
+DELETE FROM identity.customer_identity_map m
+USING tmp_deleted_records d
+WHERE m.source_system = d.source_system
+  AND m.source_record_id = d.source_record_id
+"""
+
+CREATE_TMP_CHANGED = """
+CREATE TEMP TABLE tmp_changed_global_ids
+(LIKE identity.changed_global_ids INCLUDING DEFAULTS)
+ON COMMIT DROP
+"""
+
+# changes accumulate until gold consumes them: a merge or removal
+# overrides any earlier change, an id created and then updated since
+# gold last ran is still new to gold; ids merged into an id that is
+# merged now follow it
+MERGE_CHANGED_IDS = """
+INSERT INTO identity.changed_global_ids AS c
+SELECT global_customer_id, change_type, merged_into, changed_at
+FROM tmp_changed_global_ids
+ON CONFLICT (global_customer_id) DO UPDATE SET
+    change_type = CASE
+        WHEN c.change_type = 'created'
+         AND EXCLUDED.change_type = 'updated' THEN 'created'
+        ELSE EXCLUDED.change_type
+    END,
+    merged_into = EXCLUDED.merged_into,
+    changed_at = EXCLUDED.changed_at;
+
+UPDATE identity.changed_global_ids c
+SET merged_into = t.merged_into
+FROM tmp_changed_global_ids t
+WHERE t.change_type = 'merged'
+  AND c.merged_into = t.global_customer_id;
+"""
+
+IDENTITY_MAP_COLUMNS = (
+    "global_customer_id",
+    "source_system",
+    "source_record_id",
+    "confidence_score",
+    "decision",
+    "decided_at",
+)
+
+def copy_rows(cursor, table, columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    written = 0
+
+    for row in rows:
+        writer.writerow([COPY_NULL if v is None else v for v in row])
+        written += 1
+
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) "
+        f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+        buffer
+    )
+    return written
+
 # =====================
 # RUNNER
 # =====================
@@ -125,5 +468,347 @@ def run_identity_resolution():
 
     print("✅ Phase 6 completed — Global Customer IDs assigned")
 
+def load_edges(conn, query=FETCH_EDGES, batch_rows=BATCH_ROWS, params=None):
+    """Matched edges as ((left record), (right record), score, decision)."""
+    result = conn.execution_options(
+        stream_results=True, yield_per=batch_rows
+    ).execute(text(query), params or {})
+
+    edges = []
+    for batch in result.partitions():
+        edges.extend(
+            ((ls, lr), (rs, rr), score, decision)
+            for ls, lr, rs, rr, score, decision in batch
+        )
+    return edges
+
+def resolve(conn, edges, existing, id_strategy="random"):
+    """resolve_edges() or, for deterministic ids, resolve_components()."""
+    if id_strategy == "random":
+        return resolve_edges(edges, existing)
+
+    cluster_min = {
+        global_id: (source_system, record_id)
+        for global_id, source_system, record_id in conn.execute(
+            text(FETCH_CLUSTER_MINS),
+            {"global_ids": sorted(set(existing.values()))},
+        )
+    }
+    return resolve_components(edges, existing, cluster_min)
+
+def record_changes(conn, cursor, changes, changed_at):
+    """Add this run's changes to identity.changed_global_ids."""
+    conn.execute(text(CREATE_TMP_CHANGED))
+    recorded = copy_rows(
+        cursor,
+        "tmp_changed_global_ids",
+        ("global_customer_id", "change_type", "merged_into", "changed_at"),
+        (
+            (global_id, change_type, merged_into, changed_at)
+            for global_id, (change_type, merged_into) in changes.items()
+        ),
+    )
+    conn.execute(text(MERGE_CHANGED_IDS))
+    return recorded
+
+def write_resolution(conn, existing, remaps, new_records, resolved_at):
+    """
+    Apply resolve_edges() output to identity.customer_identity_map with
+    COPY and two set-based statements (one UPDATE for absorbed clusters,
+    one INSERT for new records), and add the ids this run changed to
+    identity.changed_global_ids. Returns (inserted, reassigned).
+    """
+    conn.execute(text(CREATE_TMP_TABLES))
+    cursor = conn.connection.cursor()
+
+    copy_rows(
+        cursor,
+        "tmp_global_id_remap",
+        ("old_global_id", "new_global_id"),
+        remaps.items(),
+    )
+    copy_rows(
+        cursor,
+        "tmp_identity_map",
+        IDENTITY_MAP_COLUMNS,
+        (
+            (global_id, source_system, record_id, score, decision, resolved_at)
+            for (source_system, record_id), (global_id, score, decision)
+            in new_records.items()
+        ),
+    )
+
+    reassigned = conn.execute(text(APPLY_GLOBAL_ID_REMAP)).rowcount
+    inserted = conn.execute(text(MERGE_IDENTITY_MAP)).rowcount
+
+    record_changes(
+        conn, cursor, changed_global_ids(existing, remaps, new_records), resolved_at
+    )
+
+    return inserted, reassigned
+
+def write_rebuild(conn, assignment, resolved_at):
+    """
+    Make identity.customer_identity_map equal to a rebuilt assignment,
+    writing only the rows whose global id changed, new rows and rows of
+    records that left every cluster. Returns (written, deleted).
+    """
+    current = {
+        (source_system, record_id): global_id
+        for source_system, record_id, global_id
+        in conn.execute(text(FETCH_IDENTITY_MAP))
+    }
+    changed, deleted, changes = diff_assignments(current, assignment)
+
+    conn.execute(text(CREATE_TMP_TABLES))
+    conn.execute(text(CREATE_TMP_DELETED))
+    cursor = conn.connection.cursor()
+
+    copy_rows(
+        cursor,
+        "tmp_identity_map",
+        IDENTITY_MAP_COLUMNS,
+        (
+            (global_id, source_system, record_id, score, decision, resolved_at)
+            for (source_system, record_id), (global_id, score, decision)
+            in changed.items()
+        ),
+    )
+    copy_rows(
+        cursor,
+        "tmp_deleted_records",
+        ("source_system", "source_record_id"),
+        deleted,
+    )
+
+    conn.execute(text(UPSERT_IDENTITY_MAP))
+    conn.execute(text(DELETE_RECORDS))
+    record_changes(conn, cursor, changes, resolved_at)
+
+    return len(changed), len(deleted)
+
+def run_union_find_resolution(
+    batch_rows=BATCH_ROWS, id_strategy="random", rebuild=False
+):
+    """
+    Resolve all matched edges in memory with a union-find over records
+    and existing clusters (identity/union_find.py), then write the result
+    with write_resolution(). With random ids: same clusters, surviving
+    ids, scores and decisions as the per-pair resolver, without a round
+    trip per pair.
+
+    With rebuild=True (deterministic ids only), the clusters are rebuilt
+    from the edges alone, ignoring the current map, and only the map rows
+    whose global id differs are written.
+    """
+    print(
+        f"▶ Phase 6: Global Customer ID Resolution "
+        f"(union-find, {id_strategy} ids{', rebuild' if rebuild else ''})"
+    )
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        edges = load_edges(conn, FETCH_EDGES, batch_rows)
+        existing = {} if rebuild else {
+            (source_system, record_id): global_id
+            for source_system, record_id, global_id
+            in conn.execute(text(FETCH_EDGE_RECORD_IDS))
+        }
+        print(f"  {len(edges)} matched edges, {len(existing)} records already mapped")
+
+        remaps, new_records = resolve(conn, edges, existing, id_strategy)
+        del edges
+
+        resolved_at = datetime.now(timezone.utc)
+        if rebuild:
+            written, deleted = write_rebuild(conn, new_records, resolved_at)
+            conn.execute(text(PRUNE_GRAPH_EDGES))
+        else:
+            inserted, reassigned = write_resolution(
+                conn, existing, remaps, new_records, resolved_at
+            )
+        conn.execute(text(RECORD_ALL_EDGES), {"resolved_at": resolved_at})
+
+    seconds = time.perf_counter() - started
+    if rebuild:
+        print(
+            f"✅ Phase 6 completed — {len(new_records)} records clustered, "
+            f"{written} map rows written, {deleted} removed ({seconds:.1f}s)"
+        )
+    else:
+        print(
+            f"✅ Phase 6 completed — {inserted} records assigned, "
+            f"{reassigned} reassigned from {len(remaps)} merged clusters "
+            f"({seconds:.1f}s)"
+        )
+
+def run_incremental_resolution(batch_rows=BATCH_ROWS, id_strategy="random"):
+    """
+    Resolve only the matched edges that are not in
+    identity.identity_graph_edges yet. The existing clusters those edges
+    touch enter the union-find as single elements, so only the affected
+    components are reclustered and their other members are never read;
+    absorbed clusters are moved with one indexed UPDATE per run. The work
+    follows the number of new edges, not the size of the graph.
+
+    Edges only ever join clusters here, so the run refuses to start when
+    a resolved edge has been re-scored as a non-match: splitting its
+    cluster takes a rebuild.
+    """
+    print(f"▶ Phase 6: Global Customer ID Resolution (incremental, {id_strategy} ids)")
+    started = time.perf_counter()
+
+    with engine.begin() as conn:
+        unmatched = conn.execute(text(COUNT_UNMATCHED_EDGES)).scalar()
+        if unmatched:
+            raise RuntimeError(
+                f"{unmatched} resolved edges are no longer matches; run "
+                f"--mode unionfind --id-strategy deterministic --rebuild "
+                f"or --mode parallel to split their clusters"
+            )
+
+        conn.execute(text(CREATE_NEW_EDGES))
+        edges = load_edges(conn, FETCH_NEW_EDGES, batch_rows)
+        existing = {
+            (source_system, record_id): global_id
+            for source_system, record_id, global_id
+            in conn.execute(text(FETCH_NEW_EDGE_RECORD_IDS))
+        }
+        print(
+            f"  {len(edges)} new matched edges, "
+            f"{len(set(existing.values()))} existing clusters touched"
+        )
+
+        remaps, new_records = resolve(conn, edges, existing, id_strategy)
+        del edges
+
+        resolved_at = datetime.now(timezone.utc)
+        inserted, reassigned = write_resolution(
+            conn, existing, remaps, new_records, resolved_at
+        )
+        conn.execute(text(RECORD_NEW_EDGES), {"resolved_at": resolved_at})
+        changed = conn.execute(
+            text("SELECT COUNT(*) FROM identity.changed_global_ids")
+        ).scalar()
+
+    seconds = time.perf_counter() - started
+    print(
+        f"✅ Phase 6 completed — {inserted} records assigned, "
+        f"{reassigned} reassigned, {changed} global ids pending for gold "
+        f"({seconds:.1f}s)"
+    )
+
+def shard_forest(task):
+    """Pool task: read one edge shard on its own connection, reduce it."""
+    shard, shards, batch_rows = task
+    with engine.connect() as conn:
+        edges = load_edges(
+            conn, FETCH_EDGE_SHARD, batch_rows, {"shard": shard, "shards": shards}
+        )
+    return local_forest(edges)
+
+def run_parallel_resolution(
+    shards=DEFAULT_SHARDS, workers=DEFAULT_WORKERS, batch_rows=BATCH_ROWS
+):
+    """
+    Connected components of all matched edges over hash shards: each
+    worker process reads its shards over its own connection and reduces
+    them to spanning forests (identity/parallel_components.py), which
+    are merged in a final pass. Ids are deterministic (UUIDv5 of each
+    cluster's smallest record) and the map is written like a rebuild:
+    only rows whose global id changed.
+    """
+    print(
+        f"▶ Phase 6: Global Customer ID Resolution "
+        f"(parallel, {shards} shards, {workers} workers)"
+    )
+    started = time.perf_counter()
+
+    # the pool starts before this process opens a connection, so forked
+    # workers do not share one
+    sets, strongest = parallel_components(
+        [(shard, shards, batch_rows) for shard in range(shards)],
+        shard_forest,
+        workers,
+    )
+    assignment = component_assignment(sets, strongest)
+    del sets, strongest
+    components_seconds = time.perf_counter() - started
+
+    with engine.begin() as conn:
+        resolved_at = datetime.now(timezone.utc)
+        written, deleted = write_rebuild(conn, assignment, resolved_at)
+        conn.execute(text(PRUNE_GRAPH_EDGES))
+        conn.execute(text(RECORD_ALL_EDGES), {"resolved_at": resolved_at})
+
+    seconds = time.perf_counter() - started
+    print(
+        f"✅ Phase 6 completed — {len(assignment)} records clustered in "
+        f"{components_seconds:.1f}s, {written} map rows written, "
+        f"{deleted} removed ({seconds:.1f}s)"
+    )
+
 if __name__ == "__main__":
-    run_identity_resolution()
+    parser = argparse.ArgumentParser(description="Phase 6 identity resolution")
+    parser.add_argument(
+        "--mode",
+        choices=("pairs", "unionfind", "incremental", "parallel"),
+        default="pairs",
+        help=(
+            "pairs: one lookup/update round trip per matched pair; "
+            "unionfind: connected components in memory, bulk writes; "
+            "incremental: union-find over edges not resolved before; "
+            "parallel: sharded components in a process pool, like "
+            "unionfind --id-strategy deterministic --rebuild"
+        )
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=DEFAULT_SHARDS,
+        help="edge shards in parallel mode"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="worker processes in parallel mode"
+    )
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=BATCH_ROWS,
+        help="matched edges read per round trip in union-find modes"
+    )
+    parser.add_argument(
+        "--id-strategy",
+        choices=ID_STRATEGIES,
+        default="random",
+        help=(
+            "new cluster ids in union-find modes: random UUIDv4, or UUIDv5 "
+            "of the cluster's smallest record with a stable merge survivor"
+        )
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help=(
+            "unionfind mode: recluster all edges from scratch and write "
+            "only the map rows whose global id changed"
+        )
+    )
+    args = parser.parse_args()
+
+    if args.mode == "pairs" and args.id_strategy != "random":
+        parser.error("--id-strategy requires --mode unionfind or incremental")
+    if args.rebuild and (args.mode != "unionfind" or args.id_strategy != "deterministic"):
+        parser.error("--rebuild requires --mode unionfind --id-strategy deterministic")
+
+    if args.mode == "unionfind":
+        run_union_find_resolution(args.batch_rows, args.id_strategy, args.rebuild)
+    elif args.mode == "incremental":
+        run_incremental_resolution(args.batch_rows, args.id_strategy)
+    elif args.mode == "parallel":
+        run_parallel_resolution(args.shards, args.workers, args.batch_rows)
+    else:
+        run_identity_resolution()
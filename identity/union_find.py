@@ -0,0 +1,273 @@
+import uuid
+
+# =====================
+# UNION-FIND
+# =====================
+
+class UnionFind:
+    """Disjoint sets over hashable elements, with path compression."""
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def add(self, x):
+        if x not in self.parent:
+            self.parent[x] = x
+            self.size[x] = 1
+
+    def find(self, x):
+        parent = self.parent
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        # path compression
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b):
+        """Merge the sets of a and b (union by size); return the new root."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a
+
+    def groups(self):
+        groups = {}
+        for x in self.parent:
+            groups.setdefault(self.find(x), []).append(x)
+        return groups
+
+# =====================
+# PHASE 6 CLUSTERING
+# =====================
+
+# namespace of deterministic (UUIDv5) global customer ids
+GLOBAL_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "mdm://global_customer_id")
+
+ID_STRATEGIES = ("random", "deterministic")
+
+def new_global_id():
+    return str(uuid.uuid4())
+
+def deterministic_global_id(record):
+    """UUIDv5 of a (source_system, source_record_id) record."""
+    source_system, source_record_id = record
+    return str(uuid.uuid5(
+        GLOBAL_ID_NAMESPACE, f"{source_system}/{source_record_id}"
+    ))
+
+def resolve_edges(edges, existing, new_id=new_global_id):
+    """
+    Connected components of the match edges, with the global id
+    semantics of the per-pair resolver.
+
+    `edges` are (left_record, right_record, confidence_score, decision)
+    in resolution order; records are (source_system, source_record_id).
+    `existing` maps records already in identity.customer_identity_map
+    to their global id. An existing cluster is a single element (its
+    global id), since the per-pair resolver always moves it as a whole.
+
+    Replaying the edges in order gives the same ids: when two clusters
+    with ids merge, the left one's id survives; a cluster without an id
+    takes the other one's; two new records get a new id.
+
+    Returns (remaps, new_records):
+      remaps       old global id -> surviving global id, for existing
+                   clusters absorbed into another one
+      new_records  record -> (global id, confidence_score, decision) of
+                   the first edge that contains it, for records not in
+                   the map yet
+    """
+    sets = UnionFind()
+    # root -> global id of its component; new records have none until
+    # their first edge
+    cluster_id = {}
+    # existing cluster element -> the global id it started with
+    clusters = {}
+    first_edge = {}
+
+    def element(record):
+        global_id = existing.get(record)
+        if global_id is None:
+            sets.add(record)
+            return record
+
+        cluster = ("cluster", global_id)
+        if cluster not in clusters:
+            sets.add(cluster)
+            clusters[cluster] = cluster_id[cluster] = global_id
+        return cluster
+
+    for left, right, score, decision in edges:
+        root_a = sets.find(element(left))
+        root_b = sets.find(element(right))
+        id_a, id_b = cluster_id.get(root_a), cluster_id.get(root_b)
+
+        if id_a is not None:
+            global_id = id_a
+        elif id_b is not None:
+            global_id = id_b
+        else:
+            global_id = new_id()
+
+        cluster_id[sets.union(root_a, root_b)] = global_id
+
+        for record in (left, right):
+            if record not in existing and record not in first_edge:
+                first_edge[record] = (score, decision)
+
+    remaps = {}
+    for cluster, old_id in clusters.items():
+        global_id = cluster_id[sets.find(cluster)]
+        if global_id != old_id:
+            remaps[old_id] = global_id
+
+    new_records = {
+        record: (cluster_id[sets.find(record)], *first)
+        for record, first in first_edge.items()
+    }
+
+    return remaps, new_records
+
+def resolve_components(edges, existing, cluster_min):
+    """
+    resolve_edges() with ids that do not depend on the edge order.
+
+    `cluster_min` maps each existing global id in `existing` to the
+    smallest (source_system, source_record_id) of its members. When
+    clusters merge, the one holding the smallest record survives; a
+    component without an existing cluster gets the UUIDv5 of its
+    smallest record. Built from an empty map, every cluster's id is then
+    the UUIDv5 of its smallest record, and stays so across merges as
+    long as no new record sorts before a cluster's smallest one.
+    Scores and decisions still come from each new record's first edge.
+    """
+    sets = UnionFind()
+    clusters = {}
+    first_edge = {}
+
+    def element(record):
+        global_id = existing.get(record)
+        if global_id is None:
+            sets.add(record)
+            return record
+
+        cluster = ("cluster", global_id)
+        if cluster not in clusters:
+            sets.add(cluster)
+            clusters[cluster] = global_id
+        return cluster
+
+    for left, right, score, decision in edges:
+        sets.union(element(left), element(right))
+        for record in (left, right):
+            if record not in existing and record not in first_edge:
+                first_edge[record] = (score, decision)
+
+    # root -> (sort key, global id); existing clusters sort before new
+    # records, then by smallest member
+    survivor = {}
+    for cluster, global_id in clusters.items():
+        root = sets.find(cluster)
+        candidate = (0, cluster_min[global_id], global_id)
+        if root not in survivor or candidate < survivor[root]:
+            survivor[root] = candidate
+    for record in first_edge:
+        root = sets.find(record)
+        candidate = (1, record, None)
+        if root not in survivor or candidate < survivor[root]:
+            survivor[root] = candidate
+
+    def cluster_id(x):
+        _, smallest, global_id = survivor[sets.find(x)]
+        return global_id or deterministic_global_id(smallest)
+
+    remaps = {}
+    for cluster, old_id in clusters.items():
+        global_id = cluster_id(cluster)
+        if global_id != old_id:
+            remaps[old_id] = global_id
+
+    new_records = {
+        record: (cluster_id(record), *first)
+        for record, first in first_edge.items()
+    }
+
+    return remaps, new_records
+
+def diff_assignments(current, assignment):
+    """
+    Map rows a rebuild has to write. `current` maps records in
+    identity.customer_identity_map to their global id, `assignment`
+    maps the rebuilt records to (global id, confidence_score, decision).
+
+    Returns (changed, deleted, changes):
+      changed   assignment entries that are new or have another global id
+      deleted   mapped records that are in no cluster any more
+      changes   global id -> (change_type, merged_into), as
+                changed_global_ids()
+    """
+    changed = {
+        record: value for record, value in assignment.items()
+        if current.get(record) != value[0]
+    }
+    deleted = [record for record in current if record not in assignment]
+
+    rebuilt_ids = {global_id for global_id, _, _ in assignment.values()}
+    known = set(current.values())
+    changes = {}
+
+    for global_id, _, _ in changed.values():
+        changes[global_id] = (
+            ("updated" if global_id in known else "created"), None
+        )
+
+    # old ids that lost records: still alive, merged or gone
+    moved = {}
+    for record in list(changed) + deleted:
+        old_id = current.get(record)
+        if old_id is not None:
+            moved.setdefault(old_id, []).append(record)
+
+    for old_id, records in moved.items():
+        if old_id in changes:
+            continue
+        if old_id in rebuilt_ids:
+            changes[old_id] = ("updated", None)
+            continue
+        survivors = sorted(r for r in records if r in assignment)
+        changes[old_id] = (
+            ("merged", assignment[survivors[0]][0]) if survivors
+            else ("removed", None)
+        )
+
+    return changed, deleted, changes
+
+def changed_global_ids(existing, remaps, new_records):
+    """
+    Global ids changed by resolve_edges(), as
+    global id -> (change_type, merged_into); see
+    identity.changed_global_ids for the change types.
+    """
+    known = set(existing.values())
+    changes = {}
+
+    # new-record ids first: a new id that absorbs existing clusters is
+    # still a customer gold has never seen
+    for global_id, _, _ in new_records.values():
+        if global_id not in changes:
+            changes[global_id] = (
+                ("updated" if global_id in known else "created"), None
+            )
+
+    for old_id, global_id in remaps.items():
+        changes[old_id] = ("merged", global_id)
+        changes.setdefault(global_id, ("updated", None))
+
+    return changes
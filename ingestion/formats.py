@@ -0,0 +1,136 @@
+import io
+import zlib
+
+from jsonl_reader import decode_batch, split_batches
+
+# =====================
+# OPTIONAL BACKENDS
+# =====================
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+# key suffix -> object format
+FORMATS = {
+    ".jsonl": "jsonl",
+    ".jsonl.gz": "jsonl.gz",
+    ".jsonl.zst": "jsonl.zst",
+    ".parquet": "parquet",
+}
+
+PARQUET_BATCH_ROWS = 10_000
+
+def is_supported(object_name):
+    return object_name.endswith(tuple(FORMATS))
+
+def detect_format(object_name):
+    for suffix in sorted(FORMATS, key=len, reverse=True):
+        if object_name.endswith(suffix):
+            return FORMATS[suffix]
+    raise ValueError(f"Unsupported object format: {object_name}")
+
+def offset_unit(fmt):
+    """Unit of the resume offsets of a format: rows or (decompressed) bytes."""
+    return "rows" if fmt == "parquet" else "bytes"
+
+# =====================
+# DECOMPRESSION
+# =====================
+
+def gunzip_chunks(chunks):
+    decompressor = zlib.decompressobj(wbits=31)
+
+    for chunk in chunks:
+        while chunk:
+            out = decompressor.decompress(chunk)
+            if out:
+                yield out
+
+            # concatenated gzip members
+            if decompressor.eof:
+                chunk = decompressor.unused_data
+                decompressor = zlib.decompressobj(wbits=31)
+            else:
+                chunk = b""
+
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+def unzstd_chunks(chunks):
+    if zstandard is None:
+        raise RuntimeError("zstd objects require the 'zstandard' package")
+
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+
+    for chunk in chunks:
+        out = decompressor.decompress(chunk)
+        if out:
+            yield out
+
+def skip_bytes(chunks, count):
+    """Drop the first `count` bytes of a chunk stream."""
+    for chunk in chunks:
+        if count >= len(chunk):
+            count -= len(chunk)
+            continue
+
+        yield chunk[count:]
+        count = 0
+
+# =====================
+# READERS
+# =====================
+
+DECOMPRESSORS = {
+    "jsonl.gz": gunzip_chunks,
+    "jsonl.zst": unzstd_chunks,
+}
+
+def iter_jsonl_batches(chunks, fmt, fields, offset=0):
+    """
+    Yield (rows, end_offset) from a whole (possibly compressed) JSONL
+    object. Offsets count decompressed bytes; the first `offset` bytes
+    are skipped.
+    """
+    if fmt in DECOMPRESSORS:
+        chunks = DECOMPRESSORS[fmt](chunks)
+
+    chunks = skip_bytes(chunks, offset)
+
+    for lines, end_offset in split_batches(chunks, offset):
+        yield decode_batch(lines, fields), end_offset
+
+def iter_parquet_batches(source, fields, offset=0, batch_rows=PARQUET_BATCH_ROWS):
+    """
+    Yield (rows, end_offset) from Parquet bytes or a seekable binary
+    file, reading only `fields`. From a file, only the footer and the
+    current row group are held in memory. Offsets count rows.
+    """
+    if pq is None:
+        raise RuntimeError("Parquet objects require the 'pyarrow' package")
+
+    fields = list(fields)
+    position = 0
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+
+    for batch in pq.ParquetFile(source).iter_batches(
+        batch_size=batch_rows, columns=fields
+    ):
+        start = position
+        position += batch.num_rows
+        if position <= offset:
+            continue
+
+        columns = [batch.column(f).to_pylist() for f in fields]
+        rows = list(zip(*columns))
+        yield rows[max(offset - start, 0):], position
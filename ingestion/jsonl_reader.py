@@ -0,0 +1,67 @@
+import json
+from operator import itemgetter
+
+# =====================
+# JSON BACKEND
+# =====================
+
+try:
+    import orjson
+    _loads = orjson.loads
+    JSON_BACKEND = "orjson"
+except ImportError:
+    _loads = json.loads
+    JSON_BACKEND = "json"
+
+# =====================
+# LINE SPLITTING
+# =====================
+
+def split_batches(chunks, offset=0):
+    """
+    Split a stream of byte chunks into batches of JSONL lines.
+
+    Each chunk is split once; only the trailing partial line is carried
+    into the next chunk, so the cost is linear in the input size.
+    Yields (lines, end_offset), where end_offset is the byte position
+    just past the last line of the batch.
+    """
+    carry = b""
+    position = offset
+
+    for chunk in chunks:
+        data = carry + chunk if carry else bytes(chunk)
+        parts = data.split(b"\n")
+        carry = parts.pop()
+
+        position += len(data) - len(carry)
+        lines = [line for line in parts if line.strip()]
+        if lines:
+            yield lines, position
+
+    # flush last line (if file doesn't end with newline)
+    if carry.strip():
+        yield [carry], position + len(carry)
+
+# =====================
+# DECODING
+# =====================
+
+def decode_batch(lines, fields=None):
+    """
+    Decode a batch of JSON lines with a single parser call.
+    With `fields`, each event is projected to a tuple of those fields.
+    """
+    events = _loads(b"[" + b",".join(lines) + b"]")
+
+    if fields is None:
+        return events
+
+    fields = tuple(fields)
+    if len(fields) == 1:
+        return [(e[fields[0]],) for e in events]
+    return list(map(itemgetter(*fields), events))
+
+def iter_jsonl(chunks, fields=None):
+    for lines, _ in split_batches(chunks):
+        yield from decode_batch(lines, fields)
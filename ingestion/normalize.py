@@ -0,0 +1,52 @@
+import re
+
+# =====================
+# NORMALIZERS
+# =====================
+# Python mirrors of the Phase 3 SQL (staging/run_staging.py), used by the
+# fused ingest-and-normalize mode:
+#   LOWER(TRIM(x))                  -> normalize_text
+#   REGEXP_REPLACE(x, '\D', '', 'g') -> normalize_phone
+#
+# Non-ASCII input follows Postgres in a UTF-8 libc locale (the docker
+# image's en_US.utf8): LOWER() maps one character at a time, without
+# str.lower()'s context rules (final sigma) or multi-character results
+# (U+0130), and \d is [0-9] only. Under a "C" locale LOWER() leaves
+# non-ASCII letters alone and fused and unfused staging differ for them.
+
+NON_DIGITS = re.compile(r"\D", re.ASCII)
+
+def lower_char(ch):
+    # towlower(): one character in, one out
+    return ch.lower()[0]
+
+def normalize_text(value):
+    # TRIM() without characters strips spaces only
+    if value is None:
+        return None
+    value = value.strip(" ")
+    if value.isascii():
+        return value.lower()
+    return "".join(map(lower_char, value))
+
+def normalize_phone(value):
+    return NON_DIGITS.sub("", value) if value is not None else None
+
+# source -> raw row tuple -> (normalized_email, normalized_phone, normalized_name)
+# raw tuples follow RAW_TABLES column order in ingestion/minio_to_raw.py
+NORMALIZERS = {
+    # (order_id, email, name, zip_code, order_amount, order_ts)
+    "sales": lambda r: (normalize_text(r[1]), None, normalize_text(r[2])),
+    # (ticket_id, contact_email, issue_type, ticket_ts)
+    "support": lambda r: (normalize_text(r[1]), None, None),
+    # (lead_id, full_name, phone, lead_ts)
+    "marketing": lambda r: (None, normalize_phone(r[2]), normalize_text(r[1])),
+}
+
+NORMALIZED_COLUMNS = ["normalized_email", "normalized_phone", "normalized_name"]
+
+def normalize_rows(source, rows):
+    """Append the normalized identity columns to each raw row tuple."""
+    normalizer = NORMALIZERS[source]
+    for row in rows:
+        yield row + normalizer(row)
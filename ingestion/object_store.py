@@ -0,0 +1,220 @@
+import io
+import mmap
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+# =====================
+# LOCAL BACKEND
+# =====================
+
+@dataclass
+class LocalObject:
+    object_name: str
+    is_dir: bool = False
+    size: int = 0
+    etag: str = None
+
+class MappedObject:
+    """
+    Read handle over a memory-mapped file, exposing the subset of the
+    MinIO response API used by ingestion (stream/read/close).
+    """
+
+    def __init__(self, path, offset=0, length=None):
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # empty files cannot be mapped
+        self._map = (
+            mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if size else b""
+        )
+        self._offset = offset
+        self._size = size if length is None else min(size, offset + length)
+
+    def stream(self, amt=1024 * 1024):
+        for start in range(self._offset, self._size, amt):
+            yield self._map[start:start + amt]
+
+    def read(self):
+        return self._map[self._offset:self._size]
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def release_conn(self):
+        pass
+
+class LocalObjectStore:
+    """
+    Directory-backed stand-in for the MinIO client. Buckets are
+    directories under `root` and object keys are relative paths, so the
+    dt=/hr= layout is kept as-is and archived partitions can be replayed
+    by copying them in.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _path(self, bucket, object_name=""):
+        return self.root / bucket / object_name
+
+    def _object(self, bucket, path):
+        st = path.stat()
+        key = path.relative_to(self._path(bucket)).as_posix()
+        return LocalObject(
+            object_name=key,
+            size=st.st_size,
+            etag=f"{st.st_mtime_ns:x}-{st.st_size:x}",
+        )
+
+    def bucket_exists(self, bucket):
+        return self._path(bucket).is_dir()
+
+    def make_bucket(self, bucket):
+        self._path(bucket).mkdir(parents=True, exist_ok=True)
+
+    def put_object(self, bucket, object_name, data, length):
+        path = self._path(bucket, object_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # write then rename, so readers never see a partial object
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_bytes(data.read(length))
+        os.replace(tmp, path)
+
+    def stat_object(self, bucket, object_name):
+        return self._object(bucket, self._path(bucket, object_name))
+
+    def get_object(self, bucket, object_name, offset=0, length=None):
+        return MappedObject(self._path(bucket, object_name), offset, length)
+
+    def list_objects(self, bucket, prefix="", recursive=False, start_after=None):
+        base, _, name_prefix = prefix.rpartition("/")
+        directory = self._path(bucket, base)
+        if not directory.is_dir():
+            return
+
+        for entry in sorted(directory.iterdir()):
+            if not entry.name.startswith(name_prefix) or entry.name.startswith("."):
+                continue
+
+            key = entry.relative_to(self._path(bucket)).as_posix()
+
+            if entry.is_dir():
+                if recursive:
+                    yield from self._walk(bucket, entry, start_after)
+                elif not start_after or key + "/" > start_after:
+                    yield LocalObject(object_name=key + "/", is_dir=True)
+            elif not start_after or key > start_after:
+                yield self._object(bucket, entry)
+
+    def _walk(self, bucket, directory, start_after):
+        for entry in sorted(directory.iterdir()):
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir():
+                yield from self._walk(bucket, entry, start_after)
+                continue
+
+            obj = self._object(bucket, entry)
+            if not start_after or obj.object_name > start_after:
+                yield obj
+
+# =====================
+# RANGED READS
+# =====================
+
+class RangedObjectReader(io.RawIOBase):
+    """
+    Seekable read-only file over an object, fetching each read with a
+    ranged GET. Lets readers that seek (e.g. Parquet, which reads the
+    footer and then one row group at a time) work without the whole
+    object in memory. Wrap it in io.BufferedReader to batch small reads.
+    """
+
+    def __init__(self, store, bucket, object_name, size=None):
+        self._store = store
+        self._bucket = bucket
+        self._object_name = object_name
+        self._size = (
+            size if size is not None
+            else store.stat_object(bucket, object_name).size
+        )
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._position = max(offset, 0)
+        return self._position
+
+    def readinto(self, buffer):
+        length = min(len(buffer), self._size - self._position)
+        if length <= 0:
+            return 0
+
+        response = self._store.get_object(
+            self._bucket, self._object_name, offset=self._position, length=length
+        )
+        try:
+            data = response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+def open_ranged(store, bucket, object_name, size=None, buffer_size=1024 * 1024):
+    return io.BufferedReader(
+        RangedObjectReader(store, bucket, object_name, size), buffer_size
+    )
+
+# =====================
+# FACTORY
+# =====================
+
+def object_store_id(backend=None):
+    """Identity of the store get_object_store() returns, e.g. for cache keys."""
+    backend = backend or os.getenv("MDM_OBJECT_STORE", "minio")
+
+    if backend == "local":
+        return f"local:{os.path.abspath(os.getenv('MDM_LOCAL_STORE_DIR', 'object_store'))}"
+    return f"{backend}:localhost:9000"
+
+def get_object_store(backend=None):
+    """
+    Object store selected by MDM_OBJECT_STORE: "minio" (default) or
+    "local", rooted at MDM_LOCAL_STORE_DIR (one directory per bucket).
+    """
+    backend = backend or os.getenv("MDM_OBJECT_STORE", "minio")
+
+    if backend == "local":
+        return LocalObjectStore(os.getenv("MDM_LOCAL_STORE_DIR", "object_store"))
+
+    if backend == "minio":
+        from minio import Minio
+
+        return Minio(
+            "localhost:9000",
+            access_key="minioadmin",
+            secret_key="minioadmin",
+            secure=False,
+        )
+
+    raise ValueError(f"Unknown object store backend: {backend}")
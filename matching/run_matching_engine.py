@@ -1,10 +1,34 @@
+import argparse
+import csv
+import io
+import time
+from contextlib import nullcontext
+from dataclasses import replace
+from functools import partial
+from multiprocessing import Pool
 from sqlalchemy import create_engine, text
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
-from difflib import SequenceMatcher
 from tqdm import tqdm
 
+from scoring_rules import (
+    DEFAULT_SCORER,
+    CompiledScorer,
+    load_scoring_rules,
+    reference_similar,
+)
+from similarity import (
+    BACKENDS,
+    DEFAULT_BACKEND,
+    DEFAULT_CACHE_SIZE,
+    EXACT_BACKENDS,
+    SYMMETRIC_BACKENDS,
+    CacheStats,
+    SimilarityCache,
+    similar_batch,
+)
+
 # =====================
 # ENV & ENGINE
 # =====================
@@ -18,41 +42,27 @@ engine = create_engine(
     future=True,
 )
 
+# pairs read, scored and copied per round trip in streaming mode
+BATCH_ROWS = 50_000
+# pairs per task sent to a scoring worker process
+CHUNK_ROWS = 5_000
+COPY_NULL = r"\N"
+
 # =====================
 # SCORING FUNCTIONS
 # =====================
 
-def name_similarity(a, b):
-    if not a or not b:
-        return 0
-    return SequenceMatcher(None, a, b).ratio()
-
-def score_pair(left, right):
-    score = 0
-    email_score = 0
-    phone_score = 0
-    name_score = 0
-
-    if left["email"] and left["email"] == right["email"]:
-        email_score = 70
-        score += email_score
-
-    if left["phone"] and left["phone"] == right["phone"]:
-        phone_score = 70
-        score += phone_score
-
-    if name_similarity(left["name"], right["name"]) >= 0.85:
-        name_score = 30
-        score += name_score
-
-    if email_score == 70:
-        decision = "AUTO_MERGE"
-    elif score >= 65:
-        decision = "FLAG_REVIEW"
-    else:
-        decision = "REJECT"
-
-    return email_score, phone_score, name_score, score, decision
+def score_pair(left, right, scorer=DEFAULT_SCORER, similar=reference_similar):
+    """
+    Score one candidate pair with the compiled scoring rules
+    (matching/scoring_rules.py): email, phone and name scores, total
+    and decision. `similar(pairs, threshold)` decides name similarity.
+    """
+    return scorer.score(
+        (left["email"], left["phone"], left["name"]),
+        (right["email"], right["phone"], right["name"]),
+        similar,
+    )
 
 # =====================
 # SQL (NO DDL)
@@ -91,14 +101,197 @@ INSERT INTO staging.identity_match_candidates (
 );
 """
 
+# --- streaming mode ---
+
+STREAM_QUERY = """
+SELECT
+    left_source_system,
+    left_record_id,
+    left_email,
+    left_phone,
+    left_name,
+    right_source_system,
+    right_record_id,
+    right_email,
+    right_phone,
+    right_name
+FROM staging.identity_match_candidates_blocked
+"""
+
+TRUNCATE_SQL = "TRUNCATE staging.identity_match_candidates"
+
+CANDIDATE_COLUMNS = [
+    "left_source_system",
+    "left_record_id",
+    "right_source_system",
+    "right_record_id",
+    "email_match_score",
+    "phone_match_score",
+    "name_match_score",
+    "total_confidence_score",
+    "match_decision",
+    "evaluated_at",
+]
+
+# =====================
+# STREAMING
+# =====================
+
+# name decision cache of this process: the main process when scoring
+# serially, each pool worker otherwise (see init_name_cache)
+name_cache = None
+
+def init_name_cache(size, backend):
+    global name_cache
+    name_cache = (
+        SimilarityCache(size, backend in SYMMETRIC_BACKENDS) if size > 0 else None
+    )
+
+def score_rows(rows, backend=DEFAULT_BACKEND, scorer=DEFAULT_SCORER):
+    """
+    Score blocked-pair tuples (STREAM_QUERY order) into candidate tuples
+    (CANDIDATE_COLUMNS without evaluated_at). Name decisions for the
+    whole chunk come from one similar_batch() call. Module-level so that
+    pool workers can run it.
+    """
+    def similar(pairs, threshold):
+        return similar_batch(pairs, threshold, backend, name_cache)
+
+    scores = scorer.score_batch(
+        [(row[2:5], row[7:10]) for row in rows], similar
+    )
+    return [
+        (row[0], row[1], row[5], row[6], *row_scores)
+        for row, row_scores in zip(rows, scores)
+    ]
+
+def score_chunk(rows, backend=DEFAULT_BACKEND, scorer=DEFAULT_SCORER):
+    """score_rows() in a pool worker, with its cache stats for the chunk."""
+    if name_cache is None:
+        return score_rows(rows, backend, scorer), CacheStats()
+
+    before = replace(name_cache.stats)
+    scored = score_rows(rows, backend, scorer)
+    return scored, name_cache.stats.since(before)
+
+def scoring_pool(workers, cache_size=DEFAULT_CACHE_SIZE, backend=DEFAULT_BACKEND):
+    """
+    Process pool for score_batches(), or a null context for one worker.
+    Start it before opening a database connection, so forked workers do
+    not inherit the connection's socket.
+    """
+    if workers <= 1:
+        return nullcontext()
+    return Pool(
+        workers, initializer=init_name_cache, initargs=(cache_size, backend)
+    )
+
+def score_batches(
+    batches,
+    workers=1,
+    chunk_rows=CHUNK_ROWS,
+    backend=DEFAULT_BACKEND,
+    cache_size=DEFAULT_CACHE_SIZE,
+    cache_stats=None,
+    scorer=DEFAULT_SCORER,
+    pool=None,
+):
+    """
+    Yield (batch size, scored rows) per batch of pair tuples.
+
+    With several workers each batch is split into chunks scored by a
+    process pool, `pool` (see scoring_pool()) or one started here. imap
+    returns the chunks in submission order, so the output is the same,
+    row for row, as with a single process. Only one batch is in flight
+    at a time, which keeps memory bounded.
+
+    Name decisions are cached per process (cache_size entries, 0 to
+    disable); the hits, misses and evictions of all processes are added
+    to `cache_stats`.
+    """
+    if cache_stats is None:
+        cache_stats = CacheStats()
+
+    if workers <= 1:
+        init_name_cache(cache_size, backend)
+        for batch in batches:
+            yield len(batch), score_rows(batch, backend, scorer)
+        if name_cache is not None:
+            cache_stats.add(name_cache.stats)
+        return
+
+    if pool is None:
+        with scoring_pool(workers, cache_size, backend) as pool:
+            yield from score_batches(
+                batches, workers, chunk_rows, backend, cache_size,
+                cache_stats, scorer, pool,
+            )
+        return
+
+    score = partial(score_chunk, backend=backend, scorer=scorer)
+    for batch in batches:
+        chunks = [
+            batch[i:i + chunk_rows] for i in range(0, len(batch), chunk_rows)
+        ]
+        rows = []
+        for scored, stats in pool.imap(score, chunks):
+            rows += scored
+            cache_stats.add(stats)
+        yield len(batch), rows
+
+def report_cache(stats, cache_size):
+    if not cache_size:
+        return
+    lookups = stats.hits + stats.misses
+    print(
+        f"  name cache ({cache_size} entries per process): "
+        f"hits={stats.hits} misses={stats.misses} evictions={stats.evictions} "
+        f"hit rate={stats.hits / lookups if lookups else 0:.1%}"
+    )
+
+def copy_candidates(cursor, rows):
+    """COPY candidate rows into staging.identity_match_candidates."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    written = 0
+
+    for row in rows:
+        writer.writerow([COPY_NULL if v is None else v for v in row])
+        written += 1
+
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY staging.identity_match_candidates ({', '.join(CANDIDATE_COLUMNS)}) "
+        f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+        buffer
+    )
+    return written
+
 # =====================
 # RUNNER
 # =====================
 
-def run_matching_engine():
+def load_scorer(conn, short_circuit=False):
+    rules, decisions = load_scoring_rules(conn)
+    scorer = CompiledScorer(rules, decisions, short_circuit)
+    print(
+        f"  {len(rules)} scoring rules compiled"
+        f"{' (short-circuit: skipped checks score 0)' if short_circuit else ''}"
+    )
+    return scorer
+
+def run_matching_engine(short_circuit=False, cache_size=DEFAULT_CACHE_SIZE):
     print("▶ Phase 5: Matching Engine (Python Scoring)")
 
+    # ratio() decisions through the exact difflib backend, so repeated
+    # name pairs are decided once
+    init_name_cache(cache_size, "difflib")
+
+    def similar(pairs, threshold):
+        return similar_batch(pairs, threshold, "difflib", name_cache)
+
     with engine.begin() as conn:
+        scorer = load_scorer(conn, short_circuit)
         rows = conn.execute(text(MATCH_QUERY)).mappings().all()
 
         results = []
@@ -115,7 +308,9 @@ def run_matching_engine():
                 "name": row["right_name"],
             }
 
-            email_s, phone_s, name_s, total_s, decision = score_pair(left, right)
+            email_s, phone_s, name_s, total_s, decision = score_pair(
+                left, right, scorer, similar
+            )
 
             results.append({
                 "left_source_system": row["left_source_system"],
@@ -133,7 +328,127 @@ def run_matching_engine():
         if results:
             conn.execute(text(INSERT_SQL), results)
 
+    if name_cache is not None:
+        report_cache(name_cache.stats, cache_size)
     print(f"✅ Phase 5 completed — {len(results)} match candidates generated")
 
+def run_streaming_matching_engine(
+    batch_rows=BATCH_ROWS,
+    workers=1,
+    backend=DEFAULT_BACKEND,
+    cache_size=DEFAULT_CACHE_SIZE,
+    short_circuit=False,
+):
+    """
+    Score blocked pairs in fixed batches read through a server-side
+    cursor, writing each batch with COPY. At most one batch of pairs and
+    its results are in memory, however many pairs Phase 4.5 produced.
+    """
+    print(
+        f"▶ Phase 5: Matching Engine (streaming, {batch_rows} pairs per batch, "
+        f"{workers} worker{'s' if workers > 1 else ''}, {backend} names)"
+    )
+    if backend not in EXACT_BACKENDS:
+        print(f"  ⚠ {backend} name scores differ from SequenceMatcher.ratio()")
+    started = time.perf_counter()
+
+    # the pool starts before this process opens a connection, so forked
+    # workers do not share one
+    pool = scoring_pool(workers, cache_size, backend)
+    with pool, engine.begin() as conn:
+        scorer = load_scorer(conn, short_circuit)
+        conn.execute(text(TRUNCATE_SQL))
+        cursor = conn.connection.cursor()
+
+        result = conn.execution_options(
+            stream_results=True, yield_per=batch_rows
+        ).execute(text(STREAM_QUERY))
+        batches = (
+            [tuple(row) for row in batch] for batch in result.partitions()
+        )
+
+        written = 0
+        cache_stats = CacheStats()
+        with tqdm(desc="Scoring identity pairs", unit="pair") as progress:
+            for size, scored in score_batches(
+                batches,
+                workers,
+                backend=backend,
+                cache_size=cache_size,
+                cache_stats=cache_stats,
+                scorer=scorer,
+                pool=pool,
+            ):
+                evaluated_at = datetime.now(timezone.utc)
+                written += copy_candidates(
+                    cursor, (row + (evaluated_at,) for row in scored)
+                )
+                progress.update(size)
+
+    seconds = time.perf_counter() - started
+    report_cache(cache_stats, cache_size)
+    print(
+        f"✅ Phase 5 completed — {written} match candidates generated "
+        f"({written / seconds if seconds else 0:,.0f} pairs/s with {workers} workers)"
+    )
+
 if __name__ == "__main__":
-    run_matching_engine()
+    parser = argparse.ArgumentParser(description="Phase 5 matching engine")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="score through a server-side cursor in batches, write with COPY"
+    )
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=BATCH_ROWS,
+        help="pairs per streamed batch"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="scoring processes in streaming mode (output order is unchanged)"
+    )
+    parser.add_argument(
+        "--similarity",
+        choices=sorted(BACKENDS),
+        default=DEFAULT_BACKEND,
+        help=(
+            "name similarity backend in streaming mode; difflib and "
+            "rapidfuzz give the same decisions as the default mode"
+        )
+    )
+    parser.add_argument(
+        "--name-cache-size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE,
+        help=(
+            "name pairs whose decision is cached per process, in both "
+            "modes (0 = off)"
+        )
+    )
+    parser.add_argument(
+        "--short-circuit",
+        action="store_true",
+        help=(
+            "skip comparisons that cannot change the decision; skipped "
+            "checks score 0, so totals can be lower"
+        )
+    )
+    args = parser.parse_args()
+
+    if not args.stream and (args.workers > 1 or args.similarity != DEFAULT_BACKEND):
+        parser.error("--workers and --similarity require --stream")
+
+    if args.stream:
+        run_streaming_matching_engine(
+            args.batch_rows,
+            args.workers,
+            args.similarity,
+            args.name_cache_size,
+            args.short_circuit,
+        )
+    else:
+        run_matching_engine(args.short_circuit, args.name_cache_size)
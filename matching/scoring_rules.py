@@ -0,0 +1,215 @@
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+
+# =====================
+# SCORING CONFIG
+# =====================
+# Phase 5 rules live in gold.match_scoring_rules and
+# gold.match_decision_rules (db/init/050_matching_tables.sql). The
+# defaults below mirror the seeded rows, for callers without a database.
+
+# attributes in the order of the *_match_score columns
+ATTRIBUTES = ("email", "phone", "name")
+
+# relative cost of one comparison; checks run cheapest first
+COMPARISON_COST = {"exact": 1, "similarity": 100}
+
+@dataclass(frozen=True)
+class ScoringRule:
+    attribute: str
+    comparison: str
+    weight: int
+    threshold: float = None
+    # decision a match implies whatever the total, e.g. email -> AUTO_MERGE
+    forces_decision: str = None
+
+@dataclass(frozen=True)
+class DecisionRule:
+    decision: str
+    # 1 = strongest; a pair gets the strongest decision it qualifies for
+    rank: int
+    # total score that qualifies; NULL = only reachable through a forcing rule
+    min_score: int = None
+
+DEFAULT_RULES = [
+    ScoringRule("email", "exact", 70, forces_decision="AUTO_MERGE"),
+    ScoringRule("phone", "exact", 70),
+    ScoringRule("name", "similarity", 30, threshold=0.85),
+]
+
+DEFAULT_DECISIONS = [
+    DecisionRule("AUTO_MERGE", 1),
+    DecisionRule("FLAG_REVIEW", 2, 65),
+    DecisionRule("REJECT", 3, 0),
+]
+
+def load_scoring_rules(conn):
+    from sqlalchemy import text
+
+    rules = conn.execute(text("""
+        SELECT attribute_name, comparison, weight, threshold, forces_decision
+        FROM gold.match_scoring_rules
+    """)).all()
+
+    decisions = conn.execute(text("""
+        SELECT decision, rank, min_score
+        FROM gold.match_decision_rules
+    """)).all()
+
+    return (
+        [
+            ScoringRule(a, c, w, float(t) if t is not None else None, f)
+            for a, c, w, t, f in rules
+        ],
+        [DecisionRule(*d) for d in decisions],
+    )
+
+def reference_similar(pairs, threshold):
+    """ratio() >= threshold per pair; empty names never match."""
+    return [
+        bool(a and b) and SequenceMatcher(None, a, b).ratio() >= threshold
+        for a, b in pairs
+    ]
+
+# =====================
+# COMPILED SCORER
+# =====================
+
+class CompiledScorer:
+    """
+    Scoring rules compiled into a fixed check sequence.
+
+    Checks run cheapest first (exact before similarity). With
+    short_circuit=True a pair stops being compared as soon as no
+    remaining check can change its decision: e.g. an email match has
+    already forced AUTO_MERGE, or the remaining weights cannot lift the
+    total over the next decision threshold. Skipped checks score 0, so
+    decisions are unchanged but totals can be lower than a full
+    evaluation; the default evaluates every check.
+
+    Plain attributes only, so the scorer pickles to pool workers.
+    """
+
+    def __init__(
+        self,
+        rules=DEFAULT_RULES,
+        decisions=DEFAULT_DECISIONS,
+        short_circuit=False,
+    ):
+        self.short_circuit = short_circuit
+        self.decisions = [d.decision for d in sorted(decisions, key=lambda d: d.rank)]
+        self.min_scores = [d.min_score for d in sorted(decisions, key=lambda d: d.rank)]
+        self.fallback = len(self.decisions) - 1
+        # "no forced decision", weaker than any rank
+        self.unforced = len(self.decisions)
+
+        for rule in rules:
+            if rule.attribute not in ATTRIBUTES:
+                raise ValueError(f"unknown scoring attribute: {rule.attribute}")
+            if rule.comparison not in COMPARISON_COST:
+                raise ValueError(f"unknown comparison: {rule.comparison}")
+            if rule.comparison == "similarity" and rule.threshold is None:
+                raise ValueError(f"similarity rule without threshold: {rule.attribute}")
+            if rule.weight < 0:
+                raise ValueError(f"negative weight: {rule.attribute}")
+            if rule.forces_decision and rule.forces_decision not in self.decisions:
+                raise ValueError(f"unknown decision: {rule.forces_decision}")
+
+        ordered = sorted(
+            rules,
+            key=lambda r: (
+                COMPARISON_COST[r.comparison], -r.weight, ATTRIBUTES.index(r.attribute)
+            ),
+        )
+        # (column, exact, weight, threshold, forced rank)
+        self.checks = [
+            (
+                ATTRIBUTES.index(r.attribute),
+                r.comparison == "exact",
+                r.weight,
+                r.threshold,
+                self.decisions.index(r.forces_decision)
+                if r.forces_decision else self.unforced,
+            )
+            for r in ordered
+        ]
+
+        # best case still open before check i: weight left, strongest force
+        self.remaining_weight = [
+            sum(c[2] for c in self.checks[i:]) for i in range(len(self.checks) + 1)
+        ]
+        self.remaining_forced = [
+            min([c[4] for c in self.checks[i:]], default=self.unforced)
+            for i in range(len(self.checks) + 1)
+        ]
+        # (check, total, forced) -> decided(); totals take few values
+        self.decided_memo = {}
+
+    def decide(self, total, forced):
+        """Rank of the strongest decision the total or a forcing rule gives."""
+        for rank, min_score in enumerate(self.min_scores):
+            if rank >= forced:
+                break
+            if min_score is not None and total >= min_score:
+                return rank
+        return min(forced, self.fallback)
+
+    def decided(self, i, total, forced):
+        """True when checks i.. cannot change the decision."""
+        key = (i, total, forced)
+        result = self.decided_memo.get(key)
+        if result is None:
+            result = self.decide(total, forced) == self.decide(
+                total + self.remaining_weight[i],
+                min(forced, self.remaining_forced[i]),
+            )
+            self.decided_memo[key] = result
+        return result
+
+    def score(self, left, right, similar=reference_similar):
+        """
+        Score one pair of (email, phone, name) tuples into
+        (email_score, phone_score, name_score, total, decision).
+        `similar(pairs, threshold)` decides similarity checks.
+        """
+        return self.score_batch([(left, right)], similar)[0]
+
+    def score_batch(self, pairs, similar=reference_similar):
+        """
+        Score a list of (left, right) value tuples. Each similarity check
+        makes one similar() call for all pairs still being compared.
+        """
+        scores = [[0] * len(ATTRIBUTES) for _ in pairs]
+        totals = [0] * len(pairs)
+        forced = [self.unforced] * len(pairs)
+        active = range(len(pairs))
+
+        for i, (column, exact, weight, threshold, force) in enumerate(self.checks):
+            if self.short_circuit:
+                active = [
+                    p for p in active if not self.decided(i, totals[p], forced[p])
+                ]
+
+            if exact:
+                hits = [
+                    p for p in active
+                    if pairs[p][0][column] and pairs[p][0][column] == pairs[p][1][column]
+                ]
+            else:
+                matches = similar(
+                    [(pairs[p][0][column], pairs[p][1][column]) for p in active],
+                    threshold,
+                )
+                hits = [p for p, match in zip(active, matches) if match]
+
+            for p in hits:
+                scores[p][column] = weight
+                totals[p] += weight
+                forced[p] = min(forced[p], force)
+
+        return [
+            (*scores[p], totals[p], self.decisions[self.decide(totals[p], forced[p])])
+            for p in range(len(pairs))
+        ]
+
+DEFAULT_SCORER = CompiledScorer()
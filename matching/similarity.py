@@ -0,0 +1,265 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+
+try:
+    from rapidfuzz import process as rf_process
+    from rapidfuzz.distance import Indel, JaroWinkler, Levenshtein
+except ImportError:  # optional accelerator
+    rf_process = None
+
+# =====================
+# NAME SIMILARITY BACKENDS
+# =====================
+# Phase 5 only needs to know whether two names reach NAME_THRESHOLD, so
+# every backend answers that question for a batch of (left, right) name
+# pairs and may stop as soon as the threshold is out of reach.
+#
+#   difflib      SequenceMatcher.ratio(), the reference score, behind its
+#                real_quick_ratio() / quick_ratio() upper bounds
+#   rapidfuzz    the same decisions; the Indel (LCS) ratio, an upper bound
+#                of ratio() computed in C, rejects most pairs first
+#   levenshtein  normalized edit distance (different scores)
+#   jaro_winkler Jaro-Winkler similarity (different scores)
+
+NAME_THRESHOLD = 0.85
+
+# float slack when an upper bound from another implementation is compared
+# with the threshold; the final decision is always made by ratio()
+BOUND_EPSILON = 1e-9
+
+def ratio(a, b):
+    return SequenceMatcher(None, a, b).ratio()
+
+# ---------------------
+# EXACT (difflib scores)
+# ---------------------
+
+def difflib_similar(a, b, threshold):
+    if a == b:
+        return True
+
+    # real_quick_ratio(), without building the matcher
+    if 2.0 * min(len(a), len(b)) / (len(a) + len(b)) < threshold:
+        return False
+
+    matcher = SequenceMatcher(None, a, b)
+    return matcher.quick_ratio() >= threshold and matcher.ratio() >= threshold
+
+def difflib_batch(pairs, threshold):
+    return [difflib_similar(a, b, threshold) for a, b in pairs]
+
+def rapidfuzz_batch(pairs, threshold):
+    lefts = [a for a, _ in pairs]
+    rights = [b for _, b in pairs]
+
+    if hasattr(rf_process, "cpdist"):
+        bounds = rf_process.cpdist(
+            lefts, rights, scorer=Indel.normalized_similarity
+        )
+    else:
+        bounds = [Indel.normalized_similarity(a, b) for a, b in pairs]
+
+    return [
+        a == b or (
+            bound >= threshold - BOUND_EPSILON
+            and ratio(a, b) >= threshold
+        )
+        for (a, b), bound in zip(pairs, bounds)
+    ]
+
+# ---------------------
+# APPROXIMATE (other scores)
+# ---------------------
+
+def levenshtein_similar(a, b, threshold):
+    """1 - distance / max(len) >= threshold, with a banded early exit."""
+    longest = max(len(a), len(b))
+    max_distance = int((1 - threshold) * longest + BOUND_EPSILON)
+
+    if abs(len(a) - len(b)) > max_distance:
+        return False
+    if rf_process is not None:
+        return Levenshtein.distance(a, b, score_cutoff=max_distance) <= max_distance
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        # the distance can no longer come back under the limit
+        if min(current) > max_distance:
+            return False
+        previous = current
+
+    return previous[-1] <= max_distance
+
+def jaro_winkler(a, b, prefix_weight=0.1):
+    if a == b:
+        return 1.0
+
+    window = max(max(len(a), len(b)) // 2 - 1, 0)
+    matched_b = [False] * len(b)
+    matches_a = []
+
+    for i, ca in enumerate(a):
+        for j in range(max(0, i - window), min(len(b), i + window + 1)):
+            if not matched_b[j] and b[j] == ca:
+                matched_b[j] = True
+                matches_a.append(ca)
+                break
+
+    m = len(matches_a)
+    if not m:
+        return 0.0
+
+    matches_b = [cb for cb, hit in zip(b, matched_b) if hit]
+    transpositions = sum(x != y for x, y in zip(matches_a, matches_b)) // 2
+    jaro = (m / len(a) + m / len(b) + (m - transpositions) / m) / 3
+
+    prefix = 0
+    for ca, cb in zip(a[:4], b[:4]):
+        if ca != cb:
+            break
+        prefix += 1
+
+    return jaro + prefix * prefix_weight * (1 - jaro)
+
+def jaro_winkler_similar(a, b, threshold):
+    # upper bound: every character of the shorter name matches, and the
+    # full 4-character prefix bonus applies
+    shortest, longest = sorted((len(a), len(b)))
+    jaro_bound = (1 + shortest / longest + 1) / 3
+    if jaro_bound + 0.4 * (1 - jaro_bound) < threshold:
+        return False
+
+    if rf_process is not None:
+        return JaroWinkler.similarity(a, b) >= threshold
+    return jaro_winkler(a, b) >= threshold
+
+def each(similar):
+    return lambda pairs, threshold: [similar(a, b, threshold) for a, b in pairs]
+
+# =====================
+# REGISTRY
+# =====================
+
+BACKENDS = {
+    "difflib": difflib_batch,
+    "levenshtein": each(levenshtein_similar),
+    "jaro_winkler": each(jaro_winkler_similar),
+}
+if rf_process is not None:
+    BACKENDS["rapidfuzz"] = rapidfuzz_batch
+
+# backends whose decisions are identical to ratio() >= threshold
+EXACT_BACKENDS = {"difflib", "rapidfuzz"}
+
+# backends with sim(a, b) == sim(b, a); ratio() can depend on the order
+SYMMETRIC_BACKENDS = {"levenshtein", "jaro_winkler"}
+
+DEFAULT_BACKEND = "rapidfuzz" if rf_process is not None else "difflib"
+
+# =====================
+# DECISION CACHE
+# =====================
+
+DEFAULT_CACHE_SIZE = 100_000
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    def add(self, other):
+        self.hits += other.hits
+        self.misses += other.misses
+        self.evictions += other.evictions
+
+    def since(self, earlier):
+        return CacheStats(
+            self.hits - earlier.hits,
+            self.misses - earlier.misses,
+            self.evictions - earlier.evictions,
+        )
+
+class SimilarityCache:
+    """
+    Bounded LRU cache of threshold decisions for one backend and
+    threshold, keyed on the unordered name pair. Each entry holds the
+    decision for both orders, since ratio() is not always symmetric;
+    symmetric backends fill both at once.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, symmetric=False):
+        self.maxsize = maxsize
+        self.symmetric = symmetric
+        self.entries = OrderedDict()
+        self.stats = CacheStats()
+
+    def get(self, a, b):
+        key = (a, b) if a <= b else (b, a)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.entries.move_to_end(key)
+        return entry[a > b]
+
+    def put(self, a, b, decision):
+        key = (a, b) if a <= b else (b, a)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = [None, None]
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.stats.evictions += 1
+        else:
+            self.entries.move_to_end(key)
+
+        if self.symmetric:
+            entry[0] = entry[1] = decision
+        else:
+            entry[a > b] = decision
+
+def similar_batch(
+    pairs, threshold=NAME_THRESHOLD, backend=DEFAULT_BACKEND, cache=None
+):
+    """
+    Threshold decisions for a list of (left_name, right_name) pairs.
+
+    Empty names never match, as in the scoring rules. Each distinct
+    (left, right) pair is computed once per batch, or not at all when
+    `cache` already holds it; a pair is a cache hit when no computation
+    was needed for it.
+    """
+    decisions = [False] * len(pairs)
+    missing = {}
+
+    for i, (a, b) in enumerate(pairs):
+        if not (a and b):
+            continue
+        decision = cache.get(a, b) if cache is not None else None
+        if decision is None:
+            missing.setdefault((a, b), []).append(i)
+        else:
+            decisions[i] = decision
+
+    computed = BACKENDS[backend](list(missing), threshold)
+
+    for (pair, positions), decision in zip(missing.items(), computed):
+        for i in positions:
+            decisions[i] = decision
+        if cache is not None:
+            cache.put(*pair, decision)
+
+    if cache is not None:
+        named = sum(1 for a, b in pairs if a and b)
+        cache.stats.misses += len(missing)
+        cache.stats.hits += named - len(missing)
+
+    return decisions
@@ -6,6 +6,7 @@
 --
 -- Output:
 --   staging.identity_match_candidates_blocked
+--   staging.identity_block_index (+ _records, _state)
 --
 -- Guarantees:
 --   - Cross-source only
@@ -50,6 +51,29 @@ CREATE INDEX idx_blocked_left_record
 CREATE INDEX idx_blocked_right_record
     ON staging.identity_match_candidates_blocked (right_source_system, right_record_id);
 
+-- Rebuild the persistent block index from the same keys, so that
+-- run_blocking_engine.py --incremental extends this run (uncapped)
+TRUNCATE staging.identity_block_index,
+         staging.identity_block_records,
+         staging.identity_block_index_state;
+
+INSERT INTO staging.identity_block_index
+SELECT 'email', normalized_email, source_system, source_record_id
+FROM staging.identity_inputs
+WHERE normalized_email IS NOT NULL
+UNION
+SELECT 'phone', normalized_phone, source_system, source_record_id
+FROM staging.identity_inputs
+WHERE normalized_phone IS NOT NULL;
+
+INSERT INTO staging.identity_block_records
+SELECT DISTINCT source_system, source_record_id
+FROM staging.identity_inputs;
+
+INSERT INTO staging.identity_block_index_state
+    (built_by, key_types, max_block_size, built_at)
+VALUES ('sql', ARRAY['email', 'phone'], NULL, NOW());
+
 COMMIT;
 
 -- ============================================================
@@ -1,13 +1,14 @@
-import json, uuid, random, io
+import uuid, random, io
 from datetime import datetime, timedelta
 
 from minio_client import get_minio_client
 from shared_identities import get_identity
+from output_formats import DEFAULT_FORMAT, encode_records
 
 RECORDS_PER_FILE = 50_000
 BUCKET = "mdm-ingestion"
 
-def run(start_ts, hours, total_records):
+def run(start_ts, hours, total_records, fmt=DEFAULT_FORMAT):
     client = get_minio_client()
 
     per_hour = total_records // hours
@@ -19,29 +20,29 @@ def run(start_ts, hours, total_records):
         for _ in range(per_hour):
             name, email, phone = get_identity()
 
-            buffer.append(json.dumps({
+            buffer.append({
                 "event_type": "lead_created",
                 "lead_id": str(uuid.uuid4()),
                 "full_name": name,
                 "phone": phone,
                 "event_ts": ts.isoformat(),
                 "producer_ts": datetime.utcnow().isoformat()
-            }))
+            })
 
             if len(buffer) >= RECORDS_PER_FILE:
-                _upload(client, ts, buffer)
+                _upload(client, ts, buffer, fmt)
                 buffer.clear()
 
         if buffer:
-            _upload(client, ts, buffer)
+            _upload(client, ts, buffer, fmt)
 
         ts += timedelta(hours=1)
 
-def _upload(client, ts, records):
+def _upload(client, ts, records, fmt=DEFAULT_FORMAT):
     dt = ts.strftime("%Y-%m-%d")
     hr = ts.strftime("%H")
-    path = f"marketing/dt={dt}/hr={hr}/marketing_{uuid.uuid4().hex}.jsonl"
-    data = "\n".join(records).encode()
+    data, suffix = encode_records(records, fmt)
+    path = f"marketing/dt={dt}/hr={hr}/marketing_{uuid.uuid4().hex}{suffix}"
     client.put_object(BUCKET, path, io.BytesIO(data), len(data))
 
 if __name__ == "__main__":
@@ -1,9 +1,10 @@
-from minio import Minio
+import sys
+from pathlib import Path
+
+# the object store layer is shared with ingestion
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "ingestion"))
+
+from object_store import get_object_store
 
 def get_minio_client():
-    return Minio(
-        "localhost:9000",
-        access_key="minioadmin",
-        secret_key="minioadmin",
-        secure=False,
-    )
+    return get_object_store()
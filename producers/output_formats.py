@@ -0,0 +1,50 @@
+import gzip
+import io
+import json
+import os
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# object format -> key suffix
+SUFFIXES = {
+    "jsonl": ".jsonl",
+    "jsonl.gz": ".jsonl.gz",
+    "jsonl.zst": ".jsonl.zst",
+    "parquet": ".parquet",
+}
+
+DEFAULT_FORMAT = os.getenv("MDM_OUTPUT_FORMAT", "jsonl")
+
+def encode_records(records, fmt=DEFAULT_FORMAT):
+    """
+    Serialize a list of event dicts into one object body.
+    Returns (data, key_suffix).
+    """
+    if fmt == "parquet":
+        if pq is None:
+            raise RuntimeError("Parquet output requires the 'pyarrow' package")
+        out = io.BytesIO()
+        pq.write_table(pa.Table.from_pylist(records), out)
+        return out.getvalue(), SUFFIXES[fmt]
+
+    data = "\n".join(json.dumps(r) for r in records).encode()
+
+    if fmt == "jsonl.gz":
+        data = gzip.compress(data, compresslevel=6)
+    elif fmt == "jsonl.zst":
+        if zstandard is None:
+            raise RuntimeError("zstd output requires the 'zstandard' package")
+        data = zstandard.ZstdCompressor().compress(data)
+    elif fmt != "jsonl":
+        raise ValueError(f"Unsupported output format: {fmt}")
+
+    return data, SUFFIXES[fmt]
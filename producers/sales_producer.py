@@ -1,8 +1,9 @@
-import json, uuid, random, io
+import uuid, random, io
 from datetime import datetime, timedelta
 
 from minio_client import get_minio_client
 from shared_identities import get_identity
+from output_formats import DEFAULT_FORMAT, encode_records
 
 RECORDS_PER_FILE = 50_000
 BUCKET = "mdm-ingestion"
@@ -11,14 +12,14 @@ def ensure_bucket(client):
     if not client.bucket_exists(BUCKET):
         client.make_bucket(BUCKET)
 
-def upload(client, ts, records):
+def upload(client, ts, records, fmt=DEFAULT_FORMAT):
     dt = ts.strftime("%Y-%m-%d")
     hr = ts.strftime("%H")
-    path = f"sales/dt={dt}/hr={hr}/sales_{uuid.uuid4().hex}.jsonl"
-    data = "\n".join(records).encode()
+    data, suffix = encode_records(records, fmt)
+    path = f"sales/dt={dt}/hr={hr}/sales_{uuid.uuid4().hex}{suffix}"
     client.put_object(BUCKET, path, io.BytesIO(data), len(data))
 
-def run(start_ts, hours, total_records):
+def run(start_ts, hours, total_records, fmt=DEFAULT_FORMAT):
     client = get_minio_client()
     ensure_bucket(client)
 
@@ -31,7 +32,7 @@ def run(start_ts, hours, total_records):
         for _ in range(per_hour):
             name, email, phone = get_identity()
 
-            buffer.append(json.dumps({
+            buffer.append({
                 "event_type": "order_created",
                 "order_id": str(uuid.uuid4()),
                 "customer_name": name,
@@ -41,14 +42,14 @@ def run(start_ts, hours, total_records):
                 "order_amount": round(random.uniform(500, 5000), 2),
                 "event_ts": ts.isoformat(),
                 "producer_ts": datetime.utcnow().isoformat()
-            }))
+            })
 
             if len(buffer) >= RECORDS_PER_FILE:
-                upload(client, ts, buffer)
+                upload(client, ts, buffer, fmt)
                 buffer.clear()
 
         if buffer:
-            upload(client, ts, buffer)
+            upload(client, ts, buffer, fmt)
 
         ts += timedelta(hours=1)
 
@@ -1,14 +1,15 @@
-import json, uuid, random, io
+import uuid, random, io
 from datetime import datetime, timedelta
 
 from minio_client import get_minio_client
 from shared_identities import get_identity
+from output_formats import DEFAULT_FORMAT, encode_records
 
 RECORDS_PER_FILE = 50_000
 ISSUES = ["payment", "delivery", "refund", "login", "account"]
 BUCKET = "mdm-ingestion"
 
-def run(start_ts, hours, total_records):
+def run(start_ts, hours, total_records, fmt=DEFAULT_FORMAT):
     client = get_minio_client()
 
     per_hour = total_records // hours
@@ -20,7 +21,7 @@ def run(start_ts, hours, total_records):
         for _ in range(per_hour):
             name, email, phone = get_identity()
 
-            buffer.append(json.dumps({
+            buffer.append({
                 "event_type": "ticket_created",
                 "ticket_id": str(uuid.uuid4()),
                 "contact_email": email,
@@ -28,22 +29,22 @@ def run(start_ts, hours, total_records):
                 "issue_type": random.choice(ISSUES),
                 "event_ts": ts.isoformat(),
                 "producer_ts": datetime.utcnow().isoformat()
-            }))
+            })
 
             if len(buffer) >= RECORDS_PER_FILE:
-                _upload(client, ts, buffer)
+                _upload(client, ts, buffer, fmt)
                 buffer.clear()
 
         if buffer:
-            _upload(client, ts, buffer)
+            _upload(client, ts, buffer, fmt)
 
         ts += timedelta(hours=1)
 
-def _upload(client, ts, records):
+def _upload(client, ts, records, fmt=DEFAULT_FORMAT):
     dt = ts.strftime("%Y-%m-%d")
     hr = ts.strftime("%H")
-    path = f"support/dt={dt}/hr={hr}/support_{uuid.uuid4().hex}.jsonl"
-    data = "\n".join(records).encode()
+    data, suffix = encode_records(records, fmt)
+    path = f"support/dt={dt}/hr={hr}/support_{uuid.uuid4().hex}{suffix}"
     client.put_object(BUCKET, path, io.BytesIO(data), len(data))
 
 if __name__ == "__main__":
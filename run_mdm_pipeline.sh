@@ -12,6 +12,27 @@ POSTGRES_CONTAINER="mdm_postgres"
 DB_NAME="mdm_db"
 DB_USER="mdm_user"
 
+# extra ingestion flags, e.g. "--mode parallel --fused"
+INGEST_ARGS="${INGEST_ARGS:-}"
+
+# Phase 4.5 implementation: "sql" (self-join), "python" (inverted index)
+# or "parallel" (hash-partitioned SQL joins over several connections)
+BLOCKING_MODE="${BLOCKING_MODE:-sql}"
+BLOCKING_ARGS="${BLOCKING_ARGS:-}"
+
+# name key types (name_phonetic, name_qgram) and --sorted-neighbourhood
+# only exist in the python engine; the SQL joins block on email/phone
+if [[ "$BLOCKING_MODE" != "python" && "$BLOCKING_ARGS" =~ name_|--sorted-neighbourhood ]]; then
+  echo "❌ name blocking keys need BLOCKING_MODE=python (got $BLOCKING_MODE)" >&2
+  exit 1
+fi
+
+# extra Phase 5 flags, e.g. "--stream"
+MATCHING_ARGS="${MATCHING_ARGS:-}"
+
+# extra Phase 6 flags, e.g. "--mode unionfind"
+RESOLUTION_ARGS="${RESOLUTION_ARGS:-}"
+
 # -----------------------
 # HELPERS
 # -----------------------
@@ -77,7 +98,7 @@ echo "Phase 1 completed ✅"
 # -----------------------
 echo_step "Phase 2 — MinIO → Raw Ingestion"
 
-python ingestion/minio_to_raw.py
+python ingestion/minio_to_raw.py $INGEST_ARGS
 
 psql_exec <<'SQL'
 SELECT COUNT(*) FROM raw.sales_orders;
@@ -92,7 +113,11 @@ echo "Phase 2 completed ✅"
 # -----------------------
 echo_step "Phase 3 — Staging Normalization"
 
-python staging/run_staging.py
+if [[ "$INGEST_ARGS" == *--fused* ]]; then
+  echo "Fused ingestion already staged new rows — skipping"
+else
+  python staging/run_staging.py
+fi
 
 psql_exec <<'SQL'
 SELECT COUNT(*) FROM staging.stg_sales_customers;
@@ -107,7 +132,11 @@ echo "Phase 3 completed ✅"
 # -----------------------
 echo_step "Phase 4 — Identity Inputs"
 
-python staging/run_identity_inputs.py
+if [[ "$INGEST_ARGS" == *--fused* ]]; then
+  echo "Fused ingestion already loaded identity inputs — skipping"
+else
+  python staging/run_identity_inputs.py
+fi
 
 psql_exec <<'SQL'
 SELECT COUNT(*) FROM staging.identity_inputs;
@@ -120,7 +149,13 @@ echo "Phase 4 completed ✅"
 # -----------------------
 echo_step "Phase 4.5 — Blocking Candidates"
 
-apply_sql db/init/040_blocking_tables.sql
+if [[ "$BLOCKING_MODE" == "python" ]]; then
+  python blocking/run_blocking_engine.py $BLOCKING_ARGS
+elif [[ "$BLOCKING_MODE" == "parallel" ]]; then
+  python blocking/run_parallel_blocking.py $BLOCKING_ARGS
+else
+  apply_sql db/init/040_blocking_tables.sql
+fi
 
 psql_exec <<'SQL'
 SELECT COUNT(*) FROM staging.identity_match_candidates_blocked;
@@ -133,7 +168,7 @@ echo "Phase 4.5 completed ✅"
 # -----------------------
 echo_step "Phase 5 — Identity Matching Engine"
 
-python matching/run_matching_engine.py
+python matching/run_matching_engine.py $MATCHING_ARGS
 
 psql_exec <<'SQL'
 SELECT match_decision, COUNT(*)
@@ -148,7 +183,7 @@ echo "Phase 5 completed ✅"
 # -----------------------
 echo_step "Phase 6 — Global Customer ID Resolution"
 
-python identity/run_identity_resolution.py
+python identity/run_identity_resolution.py $RESOLUTION_ARGS
 
 psql_exec <<'SQL'
 SELECT COUNT(*) FROM identity.customer_identity_map;
@@ -1,8 +1,11 @@
+import argparse
 from sqlalchemy import create_engine, text
 import os
 from dotenv import load_dotenv
 from tqdm import tqdm
 
+from table_swap import swap_refresh
+
 # =====================
 # ENV & ENGINE
 # =====================
@@ -21,9 +24,7 @@ engine = create_engine(
 # =====================
 
 IDENTITY_INPUTS_SQL = """
-TRUNCATE staging.identity_inputs;
-
-INSERT INTO staging.identity_inputs (
+INSERT INTO {target} (
     source_system,
     source_record_id,
     normalized_email,
@@ -64,22 +65,66 @@ SELECT
 FROM staging.stg_marketing_leads;
 """
 
+# rows written to the live table since the shadow was built (fused
+# ingestion appends here); runs under the swap lock
+CATCH_UP_SQL = """
+INSERT INTO {target}
+SELECT l.*
+FROM staging.identity_inputs l
+WHERE NOT EXISTS (
+    SELECT 1
+    FROM {target} s
+    WHERE s.source_system = l.source_system
+      AND s.source_record_id = l.source_record_id
+)
+"""
+
+def catch_up(conn, target):
+    return conn.execute(text(CATCH_UP_SQL.format(target=target))).rowcount
+
 # =====================
 # RUNNER
 # =====================
 
-def run_identity_inputs():
-    print("▶ Phase 4: Identity Inputs")
-
-    with engine.begin() as conn:
-        for _ in tqdm(
-            range(1),
-            desc="Building identity inputs",
-            unit="step"
-        ):
-            conn.execute(text(IDENTITY_INPUTS_SQL))
+def run_identity_inputs(swap=False):
+    """
+    Rebuild staging.identity_inputs from the stg_* tables, either with
+    TRUNCATE + INSERT or, with swap=True, into a shadow table that is
+    swapped in by rename so readers see no downtime.
+    """
+    mode = "swap" if swap else "truncate"
+    print(f"▶ Phase 4: Identity Inputs ({mode})")
+
+    for _ in tqdm(
+        range(1),
+        desc="Building identity inputs",
+        unit="step"
+    ):
+        if swap:
+            # build and swap run in transactions of their own
+            swap_refresh(
+                engine,
+                "staging.identity_inputs",
+                IDENTITY_INPUTS_SQL,
+                catch_up=catch_up,
+            )
+            continue
+
+        with engine.begin() as conn:
+            conn.execute(text("TRUNCATE staging.identity_inputs"))
+            conn.execute(text(
+                IDENTITY_INPUTS_SQL.format(target="staging.identity_inputs")
+            ))
 
     print("✅ Phase 4 completed — staging.identity_inputs refreshed")
 
 if __name__ == "__main__":
-    run_identity_inputs()
+    parser = argparse.ArgumentParser(description="Phase 4 identity inputs")
+    parser.add_argument(
+        "--swap",
+        action="store_true",
+        help="rebuild into a shadow table swapped in by rename"
+    )
+    args = parser.parse_args()
+
+    run_identity_inputs(swap=args.swap)
@@ -1,8 +1,11 @@
+import argparse
 from sqlalchemy import create_engine, text
 from tqdm import tqdm
 import os
 from dotenv import load_dotenv
 
+from table_swap import swap_refresh
+
 load_dotenv()
 
 engine = create_engine(
@@ -12,14 +15,13 @@ engine = create_engine(
     future=True,
 )
 
+# (staging table, raw source, INSERT ... SELECT into {target}, no filter)
 STAGING_SQL = [
     # -------------------------
     # SALES
     # -------------------------
-    ("stg_sales_customers", """
-        TRUNCATE staging.stg_sales_customers;
-
-        INSERT INTO staging.stg_sales_customers (
+    ("stg_sales_customers", "raw.sales_orders", """
+        INSERT INTO {target} (
             order_id,
             normalized_email,
             normalized_phone,
@@ -32,16 +34,14 @@ STAGING_SQL = [
             NULL                    AS normalized_phone,
             LOWER(TRIM(name))       AS normalized_name,
             order_ts::timestamp
-        FROM raw.sales_orders;
+        FROM raw.sales_orders
     """),
 
     # -------------------------
     # SUPPORT
     # -------------------------
-    ("stg_support_contacts", """
-        TRUNCATE staging.stg_support_contacts;
-
-        INSERT INTO staging.stg_support_contacts (
+    ("stg_support_contacts", "raw.support_tickets", """
+        INSERT INTO {target} (
             ticket_id,
             normalized_email,
             normalized_phone,
@@ -52,16 +52,14 @@ STAGING_SQL = [
             LOWER(TRIM(contact_email)) AS normalized_email,
             NULL                       AS normalized_phone,
             ticket_ts::timestamp
-        FROM raw.support_tickets;
+        FROM raw.support_tickets
     """),
 
     # -------------------------
     # MARKETING
     # -------------------------
-    ("stg_marketing_leads", """
-        TRUNCATE staging.stg_marketing_leads;
-
-        INSERT INTO staging.stg_marketing_leads (
+    ("stg_marketing_leads", "raw.marketing_leads", """
+        INSERT INTO {target} (
             lead_id,
             normalized_name,
             normalized_phone,
@@ -72,22 +70,159 @@ STAGING_SQL = [
             LOWER(TRIM(full_name))          AS normalized_name,
             REGEXP_REPLACE(phone, '\\D', '', 'g') AS normalized_phone,
             lead_ts::timestamp
-        FROM raw.marketing_leads;
+        FROM raw.marketing_leads
     """),
 ]
 
-def run_staging():
-    print("▶ Phase 3: Staging normalization")
+# =====================
+# WATERMARKS
+# =====================
+
+# ingestion_ts defaults to now(), the start time of the loading
+# transaction, so a load that is still in flight can commit rows older
+# than rows already visible. The bound stops just before the oldest
+# transaction still open in this database, so no row at or below it can
+# appear later. Uses raw.<table>(ingestion_ts) (db/init/099_indexes.sql).
+SAFE_MAX_INGESTION_TS = """
+SELECT MAX(ingestion_ts)
+FROM {raw_table}
+WHERE ingestion_ts < COALESCE(
+    (
+        SELECT MIN(xact_start)::timestamp
+        FROM pg_stat_activity
+        WHERE datname = current_database()
+          AND pid <> pg_backend_pid()
+          AND xact_start IS NOT NULL
+    ),
+    'infinity'
+)
+"""
+
+def get_staging_watermark(conn, table_name):
+    return conn.execute(text("""
+        SELECT last_ingestion_ts
+        FROM staging.staging_watermarks
+        WHERE table_name = :table_name
+    """), {"table_name": table_name}).scalar()
+
+def update_staging_watermark(conn, table_name, ts):
+    conn.execute(text("""
+        INSERT INTO staging.staging_watermarks (table_name, last_ingestion_ts)
+        VALUES (:table_name, :ts)
+        ON CONFLICT (table_name)
+        DO UPDATE SET last_ingestion_ts = EXCLUDED.last_ingestion_ts
+    """), {"table_name": table_name, "ts": ts})
+
+# =====================
+# RUNNER
+# =====================
+
+def max_ingestion_ts(conn, raw_table):
+    # upper bound fixed up front so rows landing mid-run, or committed
+    # later by loads already in flight, wait for the next run instead of
+    # being skipped
+    return conn.execute(
+        text(SAFE_MAX_INGESTION_TS.format(raw_table=raw_table))
+    ).scalar()
+
+def refresh_table(conn, table_name, raw_table, stmt, full_refresh=False):
+    """Append new raw rows to one table, or rebuild it; rows staged."""
+    until = max_ingestion_ts(conn, raw_table)
+
+    target = f"staging.{table_name}"
+    since = None if full_refresh else get_staging_watermark(conn, table_name)
 
+    if since is None:
+        conn.execute(text(f"TRUNCATE {target}"))
+        inserted = conn.execute(text(stmt.format(target=target))).rowcount
+    elif until is None or until <= since:
+        inserted = 0
+    else:
+        inserted = conn.execute(
+            text(stmt.format(target=target) + """
+                WHERE ingestion_ts > :since
+                  AND ingestion_ts <= :until
+                ON CONFLICT DO NOTHING
+            """),
+            {"since": since, "until": until},
+        ).rowcount
+
+    if until is not None:
+        update_staging_watermark(conn, table_name, until)
+
+    return inserted
+
+def swap_table(table_name, raw_table, stmt):
+    """
+    Shadow rebuild of one table. The build and the swap each get their
+    own transaction, so the rename lock is held only for the swap, and
+    not while other tables are built. Rows staged.
+    """
     with engine.begin() as conn:
-        for table_name, stmt in tqdm(
-            STAGING_SQL,
-            desc="Building staging tables",
-            unit="table"
-        ):
-            conn.execute(text(stmt))
+        until = max_ingestion_ts(conn, raw_table)
+
+    # rows past `until` are in the shadow too; the next incremental run
+    # re-reads them and skips them on conflict
+    def move_watermark(conn):
+        if until is not None:
+            update_staging_watermark(conn, table_name, until)
+
+    # under the swap lock: raw rows past `until` the build did not see,
+    # e.g. fused ingests committed since
+    def catch_up(conn, target):
+        since = "WHERE ingestion_ts > :until" if until is not None else ""
+        return conn.execute(
+            text(stmt.format(target=target) + since + " ON CONFLICT DO NOTHING"),
+            {"until": until},
+        ).rowcount
+
+    return swap_refresh(
+        engine, f"staging.{table_name}", stmt, move_watermark, catch_up
+    )
+
+def run_staging(full_refresh=False, swap=False):
+    """
+    Normalize raw rows into the stg_* tables.
+
+    By default only rows whose ingestion_ts is past the table's staging
+    watermark are appended; a table without a watermark, or
+    full_refresh=True, is truncated and rebuilt from all of raw.
+    swap=True rebuilds every table into a shadow copy and swaps it in
+    by rename, one table at a time, so readers are never blocked by the
+    rebuild.
+    """
+    mode = "swap" if swap else "full refresh" if full_refresh else "incremental"
+    print(f"▶ Phase 3: Staging normalization ({mode})")
+
+    tables = tqdm(STAGING_SQL, desc="Building staging tables", unit="table")
+
+    if swap:
+        # one build and one swap transaction per table
+        for table_name, raw_table, stmt in tables:
+            inserted = swap_table(table_name, raw_table, stmt)
+            tqdm.write(f"  {table_name}: {inserted} rows staged")
+    else:
+        with engine.begin() as conn:
+            for table_name, raw_table, stmt in tables:
+                inserted = refresh_table(
+                    conn, table_name, raw_table, stmt, full_refresh
+                )
+                tqdm.write(f"  {table_name}: {inserted} rows staged")
 
     print("✅ Phase 3 completed")
 
 if __name__ == "__main__":
-    run_staging()
+    parser = argparse.ArgumentParser(description="Phase 3 staging normalization")
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="truncate and rebuild every stg_* table from all of raw (backfills)"
+    )
+    parser.add_argument(
+        "--swap",
+        action="store_true",
+        help="full rebuild into shadow tables swapped in by rename"
+    )
+    args = parser.parse_args()
+
+    run_staging(full_refresh=args.full_refresh, swap=args.swap)
@@ -0,0 +1,116 @@
+from sqlalchemy import text
+
+# =====================
+# SHADOW TABLE SWAP
+# =====================
+
+SWAP_LOCK_TIMEOUT = "10s"
+
+def table_indexes(conn, schema, name):
+    return conn.execute(text("""
+        SELECT indexname, indexdef
+        FROM pg_indexes
+        WHERE schemaname = :schema
+          AND tablename = :name
+    """), {"schema": schema, "name": name}).all()
+
+def table_constraints(conn, table):
+    """(constraint, type, index) of the PK/unique constraints of `table`."""
+    return conn.execute(text("""
+        SELECT c.conname, c.contype, i.relname
+        FROM pg_constraint c
+        JOIN pg_class i ON i.oid = c.conindid
+        WHERE c.conrelid = CAST(:table AS regclass)
+          AND c.contype IN ('p', 'u')
+    """), {"table": table}).all()
+
+CONSTRAINT_TYPES = {"p": "PRIMARY KEY", "u": "UNIQUE"}
+
+def swap_refresh(engine, table, build_sql, after_swap=None, catch_up=None):
+    """
+    Rebuild `table` without blocking its readers.
+
+    `build_sql` is an INSERT with a `{target}` placeholder for the table
+    to fill. It runs against an UNLOGGED shadow copy (no WAL for the
+    bulk load), which is then set LOGGED, so the swapped-in table
+    survives a crash like the one it replaces. The live table's indexes
+    and PK/unique constraints are recreated on the shadow, in a
+    transaction of its own that takes no lock on the live table.
+
+    A second, short transaction swaps the two tables by rename under
+    SWAP_LOCK_TIMEOUT. It first locks the live table in SHARE mode, so
+    writers wait but readers do not, and runs `catch_up(conn, shadow)`
+    to copy the rows written to the live table since the build (e.g. by
+    fused ingestion); readers only wait for the renames.
+    `after_swap(conn)` runs inside that transaction too, e.g. to move a
+    watermark with the swap.
+
+    Returns the number of rows loaded.
+    """
+    schema, name = table.split(".")
+    shadow = f"{name}__shadow"
+    retired = f"{name}__old"
+
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {schema}.{shadow}"))
+        conn.execute(text(f"""
+            CREATE UNLOGGED TABLE {schema}.{shadow}
+            (LIKE {table} INCLUDING DEFAULTS)
+        """))
+
+        rows = conn.execute(
+            text(build_sql.format(target=f"{schema}.{shadow}"))
+        ).rowcount
+
+        # one sequential WAL write of the loaded heap, before the indexes
+        conn.execute(text(f"ALTER TABLE {schema}.{shadow} SET LOGGED"))
+
+        # indexes are built once, after the load
+        indexes = table_indexes(conn, schema, name)
+        for index_name, index_def in indexes:
+            conn.execute(text(
+                index_def
+                .replace(f" {index_name} ON ", f" {index_name}__shadow ON ", 1)
+                .replace(f" ON {table} ", f" ON {schema}.{shadow} ", 1)
+            ))
+
+        # constraints take over their index (and its name)
+        constraints = table_constraints(conn, table)
+        for constraint, contype, index_name in constraints:
+            conn.execute(text(
+                f"ALTER TABLE {schema}.{shadow} "
+                f"ADD CONSTRAINT {constraint}__shadow "
+                f"{CONSTRAINT_TYPES[contype]} USING INDEX {index_name}__shadow"
+            ))
+
+        conn.execute(text(f"ANALYZE {schema}.{shadow}"))
+
+    constraint_indexes = {index_name for _, _, index_name in constraints}
+
+    with engine.begin() as conn:
+        conn.execute(text(f"SET LOCAL lock_timeout = '{SWAP_LOCK_TIMEOUT}'"))
+
+        if catch_up is not None:
+            conn.execute(text(f"LOCK TABLE {table} IN SHARE MODE"))
+            rows += catch_up(conn, f"{schema}.{shadow}")
+
+        conn.execute(text(f"ALTER TABLE {table} RENAME TO {retired}"))
+        conn.execute(text(f"ALTER TABLE {schema}.{shadow} RENAME TO {name}"))
+        conn.execute(text(f"DROP TABLE {schema}.{retired}"))
+
+        for index_name, _ in indexes:
+            if index_name in constraint_indexes:
+                continue
+            conn.execute(text(
+                f"ALTER INDEX {schema}.{index_name}__shadow RENAME TO {index_name}"
+            ))
+        for constraint, _, _ in constraints:
+            conn.execute(text(
+                f"ALTER TABLE {table} "
+                f"RENAME CONSTRAINT {constraint}__shadow TO {constraint}"
+            ))
+
+        if after_swap is not None:
+            after_swap(conn)
+
+    return rows
@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "blocking"))
+
+from block_index import BlockIndex
+
+def shared_email_records(count=50):
+    """`count` records, half sales and half support, sharing one email."""
+    return [
+        ("sales" if i % 2 else "support", f"r{i:03d}", "ann@example.com", None, "ann lee")
+        for i in range(count)
+    ]
+
+def components(records, pairs):
+    parent = list(range(len(records)))
+
+    def find(x):
+        while parent[x] != x:
+            x = parent[x]
+        return x
+
+    for left, right in pairs:
+        parent[find(left)] = find(right)
+    return len({find(i) for i in range(len(records))})
+
+def test_full_mode_pairs_every_cross_source_member():
+    records = shared_email_records()
+    pairs = list(BlockIndex(records, ["email"]).pairs())
+    assert len(pairs) == 25 * 25
+
+def test_oversize_exact_block_is_capped_in_full_mode():
+    records = shared_email_records()
+    index = BlockIndex(records, ["email"], max_block_size=20)
+    assert list(index.pairs()) == []
+    assert index.stats["email"].oversize_blocks == 1
+
+def test_oversize_exact_block_is_kept_in_representative_mode():
+    records = shared_email_records()
+    full = list(BlockIndex(records, ["email"]).pairs())
+    index = BlockIndex(records, ["email"], max_block_size=20, representative=True)
+    star = list(index.pairs())
+
+    assert len(star) == len(records) - 1
+    assert components(records, star) == components(records, full) == 1
+    assert index.stats["email"].oversize_blocks == 0
+
+def test_oversize_fuzzy_block_is_still_capped_in_representative_mode():
+    records = shared_email_records()
+    index = BlockIndex(
+        records, ["email", "name_phonetic"], max_block_size=20, representative=True
+    )
+    pairs = list(index.pairs())
+
+    assert len(pairs) == len(records) - 1
+    assert index.stats["name_phonetic"].oversize_blocks == 1
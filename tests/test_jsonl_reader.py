@@ -0,0 +1,87 @@
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "ingestion"))
+
+from formats import iter_jsonl_batches
+from jsonl_reader import split_batches
+
+EVENTS = [{"id": i, "name": f"customer {i}" * (i % 4)} for i in range(50)]
+DATA = b"".join(json.dumps(e).encode() + b"\n" for e in EVENTS)
+
+def chunked(data, size):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+def resume_points(batches):
+    """(end_offset, events decoded so far) after every batch."""
+    seen = []
+    points = [(0, 0)]
+    for events, end_offset in batches:
+        seen.extend(events)
+        points.append((end_offset, len(seen)))
+    return seen, points
+
+def test_split_batches_offsets_are_line_ends():
+    for lines, end_offset in split_batches(chunked(DATA, 37)):
+        assert DATA[end_offset - 1:end_offset] == b"\n"
+        assert DATA[:end_offset].endswith(lines[-1] + b"\n")
+
+def test_split_batches_resumes_from_any_end_offset():
+    batches = (
+        ([json.loads(line) for line in lines], end_offset)
+        for lines, end_offset in split_batches(chunked(DATA, 37))
+    )
+    seen, points = resume_points(batches)
+    assert seen == EVENTS
+
+    # a ranged GET from the recorded offset
+    for offset, done in points:
+        rest = [
+            json.loads(line)
+            for lines, _ in split_batches(chunked(DATA[offset:], 64), offset)
+            for line in lines
+        ]
+        assert rest == EVENTS[done:]
+
+def test_split_batches_flushes_unterminated_last_line():
+    data = DATA.rstrip(b"\n")
+    batches = list(split_batches(chunked(data, 100)))
+    assert batches[-1][1] == len(data)
+    assert json.loads(batches[-1][0][-1]) == EVENTS[-1]
+
+def check_compressed_resume(compressed, fmt):
+    seen, points = resume_points(
+        iter_jsonl_batches(chunked(compressed, 53), fmt, None)
+    )
+    assert seen == EVENTS
+    assert points[-1][0] == len(DATA)
+
+    # the object is re-read from the start; offsets count decompressed bytes
+    for offset, done in points:
+        rest = [
+            event
+            for events, _ in iter_jsonl_batches(
+                chunked(compressed, 53), fmt, None, offset
+            )
+            for event in events
+        ]
+        assert rest == EVENTS[done:]
+
+def test_gzip_resumes_from_decompressed_offset():
+    check_compressed_resume(gzip.compress(DATA), "jsonl.gz")
+
+def test_concatenated_gzip_members_resume():
+    half = len(DATA) // 2
+    half = DATA.index(b"\n", half) + 1
+    members = gzip.compress(DATA[:half]) + gzip.compress(DATA[half:])
+    check_compressed_resume(members, "jsonl.gz")
+
+def test_zstd_resumes_from_decompressed_offset():
+    zstandard = pytest.importorskip("zstandard")
+    compressed = zstandard.ZstdCompressor().compress(DATA)
+    check_compressed_resume(compressed, "jsonl.zst")
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "ingestion"))
+
+from normalize import normalize_phone, normalize_rows, normalize_text
+
+# expected values are what the Phase 3 SQL returns on the docker image
+# (postgres:15, en_US.utf8): LOWER(TRIM(x)), REGEXP_REPLACE(x, '\D', '', 'g')
+
+def test_trim_strips_spaces_only():
+    assert normalize_text("  Ann.Lee@Example.COM ") == "ann.lee@example.com"
+    assert normalize_text("\tann lee\n") == "\tann lee\n"
+    assert normalize_text(None) is None
+
+def test_lower_maps_one_character_at_a_time():
+    # str.lower() would give a final sigma and a combining dot
+    assert normalize_text("ΟΔΟΣ") == "οδοσ"
+    assert normalize_text("İlker") == "ilker"
+    assert normalize_text("JOSÉ ÑÚÑEZ") == "josé ñúñez"
+    assert all(
+        len(normalize_text(chr(c))) == 1
+        for c in range(0x80, 0x3000)
+        if not 0xD800 <= c < 0xE000
+    )
+
+def test_phone_keeps_ascii_digits_only():
+    assert normalize_phone("+1 (555) 010-2030") == "15550102030"
+    # Arabic-Indic and fullwidth digits are not [[:digit:]] in libc
+    assert normalize_phone("٣٤5５6") == "56"
+    assert normalize_phone(None) is None
+
+def test_rows_get_identity_columns_appended():
+    row = ("L1", " Ann LEE ", "555-0102", "2026-01-01")
+    assert list(normalize_rows("marketing", [row])) == [
+        row + (None, "5550102", "ann lee")
+    ]
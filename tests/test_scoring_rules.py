@@ -0,0 +1,95 @@
+import ast
+import re
+import sys
+from difflib import SequenceMatcher
+from itertools import product
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "matching"))
+
+from scoring_rules import CompiledScorer, DecisionRule, ScoringRule
+
+def seeded_rows(table):
+    """VALUES tuples of the INSERT INTO `table` in 050_matching_tables.sql."""
+    sql = (ROOT / "db/init/050_matching_tables.sql").read_text()
+    block = re.search(
+        rf"INSERT INTO {re.escape(table)}.*?VALUES(.*?)ON CONFLICT", sql, re.S
+    ).group(1)
+    return [
+        ast.literal_eval(row.replace("NULL", "None"))
+        for row in re.findall(r"\([^()]*\)", block)
+    ]
+
+def seeded_scorer(short_circuit=False):
+    rules = [
+        ScoringRule(a, c, w, float(t) if t is not None else None, f)
+        for a, c, w, t, f in seeded_rows("gold.match_scoring_rules")
+    ]
+    decisions = [DecisionRule(*d) for d in seeded_rows("gold.match_decision_rules")]
+    return CompiledScorer(rules, decisions, short_circuit)
+
+def legacy_score_pair(left, right):
+    """The hard-coded Phase 5 score_pair() the rules replaced."""
+    score = email_score = phone_score = name_score = 0
+
+    if left[0] and left[0] == right[0]:
+        email_score = 70
+        score += email_score
+    if left[1] and left[1] == right[1]:
+        phone_score = 70
+        score += phone_score
+    if left[2] and right[2] and SequenceMatcher(None, left[2], right[2]).ratio() >= 0.85:
+        name_score = 30
+        score += name_score
+
+    if email_score == 70:
+        decision = "AUTO_MERGE"
+    elif score >= 65:
+        decision = "FLAG_REVIEW"
+    else:
+        decision = "REJECT"
+    return email_score, phone_score, name_score, score, decision
+
+EMAILS = [("ann@example.com", "ann@example.com"), ("ann@example.com", "bob@example.com"),
+          (None, None), ("", ""), ("ann@example.com", None)]
+PHONES = [("5550102", "5550102"), ("5550102", "5550199"), (None, None), ("", "")]
+NAMES = [
+    ("ann lee", "ann lee"),
+    # ratio 0.857..., just over the threshold
+    ("jonathan smyth", "jonathon smith"),
+    # ratio 0.8, just under
+    ("maria", "marie"),
+    ("ann lee", "robert brown"),
+    ("ann lee", None),
+    (None, None),
+]
+
+def pairs():
+    return [
+        ((e[0], p[0], n[0]), (e[1], p[1], n[1]))
+        for e, p, n in product(EMAILS, PHONES, NAMES)
+    ]
+
+def test_name_fixtures_straddle_the_threshold():
+    assert SequenceMatcher(None, "jonathan smyth", "jonathon smith").ratio() >= 0.85
+    assert SequenceMatcher(None, "maria", "marie").ratio() < 0.85
+
+def test_seeded_rules_score_like_the_hard_coded_rules():
+    scorer = seeded_scorer()
+    for left, right in pairs():
+        assert scorer.score(left, right) == legacy_score_pair(left, right), (left, right)
+
+def test_batch_scoring_matches_pair_scoring():
+    scorer = seeded_scorer()
+    assert scorer.score_batch(pairs()) == [
+        legacy_score_pair(left, right) for left, right in pairs()
+    ]
+
+def test_short_circuit_keeps_every_decision():
+    scorer = seeded_scorer(short_circuit=True)
+    for (left, right), scores in zip(pairs(), scorer.score_batch(pairs())):
+        legacy = legacy_score_pair(left, right)
+        assert scores[4] == legacy[4], (left, right)
+        # skipped checks score 0, never more than a full evaluation
+        assert all(s <= l for s, l in zip(scores[:4], legacy[:4]))
@@ -0,0 +1,78 @@
+import random
+import sys
+from difflib import SequenceMatcher
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "matching"))
+
+from similarity import (
+    BACKENDS,
+    EXACT_BACKENDS,
+    NAME_THRESHOLD,
+    SimilarityCache,
+    similar_batch,
+)
+
+# backends installed here that must give ratio() decisions
+EXACT = sorted(EXACT_BACKENDS & set(BACKENDS))
+
+def reference(pairs):
+    """The Phase 5 rule: SequenceMatcher(None, a, b).ratio() >= 0.85."""
+    return [
+        bool(a and b) and SequenceMatcher(None, a, b).ratio() >= NAME_THRESHOLD
+        for a, b in pairs
+    ]
+
+BOUNDARY = [
+    # ratio() == 0.85 exactly: matches
+    ("abcdefghijklmnopqrst", "abcdefghijklmnopqXYZ"),
+    # 28/33 = 0.848...: does not
+    ("abcdefghijklmnop", "abcdefghijklmnXYZ"),
+    ("jonathan smyth", "jonathon smith"),
+    ("maria", "marie"),
+    ("ann lee", "ann lee"),
+    ("ann lee", ""),
+    (None, "ann lee"),
+]
+
+# ratio() depends on the argument order, across the threshold
+ASYMMETRIC = [
+    ("nnbnna", "bnnb nna"),
+    ("bbabnbnb aa ", "bbbnbbaa "),
+    ("baanbaaab", "nbaanaaab"),
+    ("nb baan ", "nb ba a "),
+]
+
+def random_pairs(count=3_000, seed=7):
+    rng = random.Random(seed)
+    alphabet = "abn e"
+    word = lambda: "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 14)))
+    return [(word(), word()) for _ in range(count)]
+
+def test_fixtures_are_what_they_claim():
+    ratio = lambda a, b: SequenceMatcher(None, a, b).ratio()
+    assert ratio(*BOUNDARY[0]) == NAME_THRESHOLD
+    assert ratio(*BOUNDARY[1]) < NAME_THRESHOLD
+    for a, b in ASYMMETRIC:
+        assert (ratio(a, b) >= NAME_THRESHOLD) != (ratio(b, a) >= NAME_THRESHOLD)
+
+def test_exact_backends_match_ratio():
+    pairs = BOUNDARY + ASYMMETRIC + [(b, a) for a, b in ASYMMETRIC] + random_pairs()
+    expected = reference(pairs)
+    assert sum(expected) > 10
+
+    for backend in EXACT:
+        assert similar_batch(pairs, NAME_THRESHOLD, backend) == expected, backend
+
+def test_cache_keeps_each_order_of_asymmetric_pairs():
+    pairs = ASYMMETRIC + [(b, a) for a, b in ASYMMETRIC]
+    expected = reference(pairs)
+
+    for backend in EXACT:
+        cache = SimilarityCache(symmetric=False)
+        # one order computed and cached first, then both from the cache
+        assert similar_batch(ASYMMETRIC, NAME_THRESHOLD, backend, cache) == expected[:4]
+        assert similar_batch(pairs, NAME_THRESHOLD, backend, cache) == expected
+        assert similar_batch(pairs, NAME_THRESHOLD, backend, cache) == expected
+        assert cache.stats.hits == 4 + 8
@@ -0,0 +1,265 @@
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "identity"))
+
+from parallel_components import (
+    component_assignment,
+    parallel_components,
+    shard_edges,
+)
+from union_find import (
+    changed_global_ids,
+    deterministic_global_id,
+    diff_assignments,
+    resolve_components,
+    resolve_edges,
+)
+
+def ids(*names):
+    """Deterministic stand-in for new_global_id()."""
+    it = iter(names)
+    return lambda: next(it)
+
+def test_new_id_absorbing_an_existing_cluster_is_created():
+    # two new records get "new-1", then the new component (left) absorbs
+    # the existing cluster "old"
+    existing = {("sales", "s9"): "old"}
+    edges = [
+        (("marketing", "m1"), ("sales", "s1"), 70, "AUTO_MERGE"),
+        (("marketing", "m1"), ("sales", "s9"), 70, "AUTO_MERGE"),
+    ]
+    remaps, new_records = resolve_edges(edges, existing, ids("new-1"))
+    assert remaps == {"old": "new-1"}
+
+    assert changed_global_ids(existing, remaps, new_records) == {
+        "new-1": ("created", None),
+        "old": ("merged", "new-1"),
+    }
+
+def test_existing_id_gaining_records_is_updated():
+    existing = {("sales", "s9"): "old", ("support", "t9"): "other"}
+    edges = [
+        (("sales", "s9"), ("marketing", "m1"), 70, "FLAG_REVIEW"),
+        (("sales", "s9"), ("support", "t9"), 70, "AUTO_MERGE"),
+    ]
+    remaps, new_records = resolve_edges(edges, existing, ids())
+
+    assert changed_global_ids(existing, remaps, new_records) == {
+        "old": ("updated", None),
+        "other": ("merged", "old"),
+    }
+
+# =====================
+# UNION-FIND VS PER-PAIR RESOLVER
+# =====================
+
+def resolve_per_pair(edges, mapped, new_id):
+    """
+    Replica of run_identity_resolution(): pairs in order, the left
+    cluster absorbs the right one, INSERT ... ON CONFLICT DO NOTHING
+    keeps the first (global id, score, decision) of a record.
+    """
+    rows = {record: list(row) for record, row in mapped.items()}
+
+    for left, right, score, decision in edges:
+        left_id = rows[left][0] if left in rows else None
+        right_id = rows[right][0] if right in rows else None
+
+        if left_id and right_id and left_id != right_id:
+            global_id = left_id
+            for row in rows.values():
+                if row[0] == right_id:
+                    row[0] = global_id
+        elif left_id:
+            global_id = left_id
+        elif right_id:
+            global_id = right_id
+        else:
+            global_id = new_id()
+
+        for record in (left, right):
+            rows.setdefault(record, [global_id, score, decision])
+
+    return {record: tuple(row) for record, row in rows.items()}
+
+def resolve_with_union_find(edges, mapped, new_id):
+    """resolve_edges() output applied to the map, as write_resolution()."""
+    existing = {record: row[0] for record, row in mapped.items()}
+    remaps, new_records = resolve_edges(edges, existing, new_id)
+
+    rows = {
+        record: (remaps.get(global_id, global_id), *mapped[record][1:])
+        for record, global_id in existing.items()
+    }
+    rows.update(new_records)
+    return rows
+
+def counter_ids():
+    counter = iter(range(1_000_000))
+    return lambda: f"id-{next(counter)}"
+
+def random_edges(rng, records, count):
+    edges = []
+    for _ in range(count):
+        left, right = rng.sample(records, 2)
+        edges.append((
+            left, right,
+            rng.choice((65, 70, 100, 140)),
+            rng.choice(("AUTO_MERGE", "FLAG_REVIEW")),
+        ))
+    return edges
+
+def test_union_find_matches_per_pair_resolver():
+    for seed in range(200):
+        rng = random.Random(seed)
+        records = [
+            (source, f"{source[0]}{i}")
+            for source in ("sales", "support", "marketing")
+            for i in range(rng.randint(2, 12))
+        ]
+        # a few existing clusters, each of several records
+        mapped = {
+            record: (f"old-{rng.randint(0, 4)}", 70, "AUTO_MERGE")
+            for record in rng.sample(records, rng.randint(0, len(records) // 2))
+        }
+        edges = random_edges(rng, records, rng.randint(1, 40))
+        # repeated records and chains: replay some edges, reversed too
+        edges += [(r, l, s, d) for l, r, s, d in rng.sample(edges, len(edges) // 3)]
+        edges += rng.sample(edges, len(edges) // 4)
+
+        assert resolve_with_union_find(edges, mapped, counter_ids()) == (
+            resolve_per_pair(edges, mapped, counter_ids())
+        ), seed
+
+def test_chain_of_merges_keeps_the_leftmost_id():
+    a, b, c, d = (("sales", "s1"), ("support", "t1"),
+                  ("marketing", "m1"), ("sales", "s2"))
+    mapped = {
+        a: ("A", 100, "AUTO_MERGE"),
+        c: ("C", 100, "AUTO_MERGE"),
+    }
+    edges = [
+        (b, d, 70, "FLAG_REVIEW"),
+        (c, d, 70, "AUTO_MERGE"),
+        (a, b, 100, "AUTO_MERGE"),
+        (b, d, 140, "AUTO_MERGE"),
+    ]
+
+    rows = resolve_with_union_find(edges, mapped, counter_ids())
+    assert rows == resolve_per_pair(edges, mapped, counter_ids())
+    assert {row[0] for row in rows.values()} == {"A"}
+    assert rows[d] == ("A", 70, "FLAG_REVIEW")
+
+# =====================
+# REBUILDS (DETERMINISTIC IDS)
+# =====================
+
+S1, S2, T1, M1, M2 = (
+    ("sales", "s1"), ("sales", "s2"), ("support", "t1"),
+    ("marketing", "m1"), ("marketing", "m2"),
+)
+
+def rebuild(edges):
+    """Rebuilt assignment from the edges alone, as --rebuild does."""
+    _, new_records = resolve_components(edges, {}, {})
+    return new_records
+
+def global_ids(assignment):
+    return {record: value[0] for record, value in assignment.items()}
+
+def test_diff_leaves_unchanged_rows_alone():
+    assignment = rebuild([(S1, T1, 100, "AUTO_MERGE"), (M1, S2, 70, "FLAG_REVIEW")])
+    current = global_ids(assignment)
+
+    assert diff_assignments(current, assignment) == ({}, [], {})
+
+def test_diff_removes_records_that_left_every_cluster():
+    before = rebuild([(S1, T1, 100, "AUTO_MERGE"), (M1, S2, 70, "FLAG_REVIEW")])
+    after = rebuild([(S1, T1, 100, "AUTO_MERGE")])
+
+    changed, deleted, changes = diff_assignments(global_ids(before), after)
+    assert changed == {}
+    assert sorted(deleted) == [M1, S2]
+    assert changes == {before[M1][0]: ("removed", None)}
+
+def test_diff_reports_merges_into_the_surviving_cluster():
+    before = rebuild([(S1, T1, 100, "AUTO_MERGE"), (M1, S2, 70, "FLAG_REVIEW")])
+    after = rebuild([
+        (S1, T1, 100, "AUTO_MERGE"),
+        (M1, S2, 70, "FLAG_REVIEW"),
+        (T1, M1, 70, "FLAG_REVIEW"),
+    ])
+    survivor = deterministic_global_id(min(after))
+
+    changed, deleted, changes = diff_assignments(global_ids(before), after)
+    assert deleted == []
+    # only the rows whose id moved are written
+    assert set(changed) == {
+        r for r in after if before[r][0] != survivor
+    }
+    # M1 is the smallest record, so its cluster absorbs S1's
+    assert survivor == before[M1][0]
+    assert changes == {
+        survivor: ("updated", None),
+        before[S1][0]: ("merged", survivor),
+    }
+
+def permutations_of(edges, count=50, seed=3):
+    rng = random.Random(seed)
+    for _ in range(count):
+        shuffled = [
+            (r, l, s, d) if rng.random() < 0.5 else (l, r, s, d)
+            for l, r, s, d in edges
+        ]
+        rng.shuffle(shuffled)
+        yield shuffled
+
+def test_deterministic_ids_do_not_depend_on_edge_order():
+    rng = random.Random(11)
+    records = [(s, f"{s[0]}{i}") for s in ("sales", "support", "marketing") for i in range(15)]
+    edges = random_edges(rng, records, 25)
+
+    expected = global_ids(rebuild(edges))
+    clusters = {}
+    for record, global_id in expected.items():
+        clusters.setdefault(global_id, []).append(record)
+    # every id is the UUIDv5 of its cluster's smallest record
+    assert all(
+        global_id == deterministic_global_id(min(members))
+        for global_id, members in clusters.items()
+    )
+
+    for shuffled in permutations_of(edges):
+        assert global_ids(rebuild(shuffled)) == expected
+        # the partitioned mode agrees, whatever the sharding
+        sets, strongest = parallel_components(shard_edges(shuffled, 4), workers=1)
+        assert global_ids(component_assignment(sets, strongest)) == expected
+
+def test_merge_survivor_does_not_depend_on_edge_order():
+    existing = {S2: "cluster-a", T1: "cluster-b", M2: "cluster-c"}
+    cluster_min = {"cluster-a": S2, "cluster-b": T1, "cluster-c": M2}
+    edges = [
+        (S2, T1, 70, "FLAG_REVIEW"),
+        (T1, M1, 100, "AUTO_MERGE"),
+        (M1, M2, 70, "FLAG_REVIEW"),
+        (S1, M1, 70, "FLAG_REVIEW"),
+    ]
+
+    results = {
+        (
+            tuple(sorted(remaps.items())),
+            tuple(sorted(global_ids(new_records).items())),
+        )
+        for remaps, new_records in (
+            resolve_components(shuffled, existing, cluster_min)
+            for shuffled in permutations_of(edges)
+        )
+    }
+    assert len(results) == 1
+
+    remaps, _ = resolve_components(edges, existing, cluster_min)
+    # the existing cluster holding the smallest record survives
+    assert remaps == {"cluster-a": "cluster-c", "cluster-b": "cluster-c"}